@@ -1,22 +1,241 @@
 """Database operations for agentctl"""
 
+import atexit
+import copy
+import logging
 import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from itertools import groupby
 from pathlib import Path
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta
+from typing import Deque, Iterator, List, Dict, Optional, Tuple
 import json
 
 DB_PATH = Path.home() / ".agentctl" / "agentctl.db"
 
+logger = logging.getLogger(__name__)
+
+# Applied once when a connection is opened. WAL lets dashboard reads run
+# alongside event writes; synchronous=NORMAL only fsyncs at checkpoints.
+# foreign_keys stays off: events/prompt_history reference tasks that live
+# in markdown files and may never be synced into the tasks table.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+# Per-connection prepared-statement cache size (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+# How often (seconds) the background writer drains queue_write() statements
+WRITE_FLUSH_INTERVAL = 0.1
+
+# How long (seconds) a get_analytics_summary() result is served from memory
+ANALYTICS_SUMMARY_TTL = 0.5
+
+# Hot statements, kept as module constants so every call hands sqlite3 the
+# same SQL text and hits the connection's prepared-statement cache
+_SQL_ACTIVE_AGENTS = """
+    SELECT
+        t.id as task_id,
+        p.name as project,
+        t.agent_status,
+        t.phase,
+        t.agent_type,
+        t.commits,
+        t.tmux_session,
+        t.started_at
+    FROM tasks t
+    LEFT JOIN projects p ON t.project_id = p.id
+    WHERE t.agent_status IN ('running', 'blocked')
+    ORDER BY t.started_at DESC
+"""
+
+_SQL_QUEUED_TASKS = """
+    SELECT t.id, p.name as project, t.category, t.priority, t.title
+    FROM tasks t
+    LEFT JOIN projects p ON t.project_id = p.id
+    WHERE t.agent_status = 'queued'
+    ORDER BY
+        CASE t.priority
+            WHEN 'high' THEN 1
+            WHEN 'medium' THEN 2
+            WHEN 'low' THEN 3
+        END,
+        t.created_at ASC
+"""
+
+_SQL_INSERT_EVENT = """
+    INSERT INTO events (task_id, event_type, timestamp, data)
+    VALUES (?, ?, ?, ?)
+"""
+
+_SQL_RECENT_EVENTS = """
+    SELECT task_id, event_type, timestamp, data
+    FROM events
+    ORDER BY timestamp DESC
+    LIMIT ?
+"""
+
+# The "recent" lists sort by id, which is the rowid (INTEGER PRIMARY KEY), so
+# SQLite reads the newest N entries straight off the table b-tree (or off
+# idx_user_prompts_type, whose entries end in the rowid) with no temp sort
+_SQL_ANALYTICS_SUMMARY = """
+    SELECT
+        (SELECT json_group_object(key, value) FROM analytics_totals) as totals,
+        (SELECT json_group_array(json_object('tool_name', tool_name, 'total', total))
+         FROM (
+            SELECT tool_name, total
+            FROM tool_usage_totals
+            WHERE total > 0
+            ORDER BY total DESC, tool_name
+            LIMIT 5
+         )) as top_tools,
+        (SELECT json_group_array(json_object(
+            'task_id', task_id, 'error_type', error_type, 'error_message', error_message))
+         FROM (
+            SELECT task_id, error_type, error_message
+            FROM session_errors
+            ORDER BY id DESC
+            LIMIT 5
+         )) as recent_errors,
+        (SELECT json_group_array(json_object(
+            'task_id', task_id, 'prompt', prompt, 'prompt_type', prompt_type))
+         FROM (
+            SELECT task_id, prompt, prompt_type
+            FROM user_prompts
+            WHERE prompt_type = 'message'
+            ORDER BY id DESC
+            LIMIT 10
+         )) as recent_prompts
+"""
+
+
+# query_tasks() filters, in bit order: bit 0 = status, 1 = priority, 2 = project
+_QUERY_TASKS_FILTERS = ("t.agent_status = ?", "t.priority = ?", "t.project_id = ?")
+
+
+def _build_query_tasks_sql(mask: int) -> str:
+    """Build the query_tasks() statement for one combination of filters"""
+    conditions = [cond for bit, cond in enumerate(_QUERY_TASKS_FILTERS) if mask & (1 << bit)]
+    where_clause = " AND ".join(conditions) if conditions else "1=1"
+    return f"""
+        SELECT
+            t.id as task_id,
+            t.title,
+            t.agent_status,
+            t.priority,
+            t.phase,
+            t.started_at
+        FROM tasks t
+        WHERE {where_clause}
+        ORDER BY t.created_at DESC
+    """
+
+
+# Every filter combination prebuilt, so each call reuses a cached statement
+_QUERY_TASKS_SQL = {mask: _build_query_tasks_sql(mask) for mask in range(1 << len(_QUERY_TASKS_FILTERS))}
+
+# Full-text indexes mirroring prompt and history text. The trigram tokenizer
+# matches any substring of 3+ characters case-insensitively, like the
+# LIKE '%term%' scans it replaces (it also folds non-ASCII case, which LIKE
+# doesn't)
+_SQL_CREATE_PROMPT_FTS = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS prompts_fts USING fts5(
+        text, title, content='prompts', content_rowid='rowid', tokenize='trigram'
+    );
+
+    CREATE TRIGGER IF NOT EXISTS trg_prompts_fts_insert AFTER INSERT ON prompts
+    BEGIN
+        INSERT INTO prompts_fts (rowid, text, title) VALUES (NEW.rowid, NEW.text, NEW.title);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_prompts_fts_delete AFTER DELETE ON prompts
+    BEGIN
+        INSERT INTO prompts_fts (prompts_fts, rowid, text, title) VALUES ('delete', OLD.rowid, OLD.text, OLD.title);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_prompts_fts_update AFTER UPDATE OF text, title ON prompts
+    BEGIN
+        INSERT INTO prompts_fts (prompts_fts, rowid, text, title) VALUES ('delete', OLD.rowid, OLD.text, OLD.title);
+        INSERT INTO prompts_fts (rowid, text, title) VALUES (NEW.rowid, NEW.text, NEW.title);
+    END;
+
+    CREATE VIRTUAL TABLE IF NOT EXISTS prompt_history_fts USING fts5(
+        prompt_text, content='prompt_history', content_rowid='rowid', tokenize='trigram'
+    );
+
+    CREATE TRIGGER IF NOT EXISTS trg_prompt_history_fts_insert AFTER INSERT ON prompt_history
+    BEGIN
+        INSERT INTO prompt_history_fts (rowid, prompt_text) VALUES (NEW.rowid, NEW.prompt_text);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_prompt_history_fts_delete AFTER DELETE ON prompt_history
+    BEGIN
+        INSERT INTO prompt_history_fts (prompt_history_fts, rowid, prompt_text) VALUES ('delete', OLD.rowid, OLD.prompt_text);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_prompt_history_fts_update AFTER UPDATE OF prompt_text ON prompt_history
+    BEGIN
+        INSERT INTO prompt_history_fts (prompt_history_fts, rowid, prompt_text) VALUES ('delete', OLD.rowid, OLD.prompt_text);
+        INSERT INTO prompt_history_fts (rowid, prompt_text) VALUES (NEW.rowid, NEW.prompt_text);
+    END;
+"""
+
+# Set by init_db(): False when SQLite lacks FTS5 or the trigram tokenizer,
+# in which case prompt searches fall back to a table scan
+FTS_AVAILABLE = False
+
+# UPDATE/DELETE ... RETURNING needs SQLite 3.35+
+SUPPORTS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# One long-lived connection per thread, reused across calls
+_local = threading.local()
+_open_connections: List[sqlite3.Connection] = []
+_open_connections_lock = threading.Lock()
+
+# Deferred writes waiting to be committed: (sql, params) in queue order
+_write_queue: Deque[Tuple[str, Tuple]] = deque()
+_write_flush_lock = threading.Lock()
+_writer: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+
+# get_analytics_summary() cache: (version, monotonic time, summary). Local
+# writes bump the version; the TTL bounds staleness from other processes.
+_analytics_version = 0
+_analytics_cache: Optional[Tuple[int, float, Dict]] = None
+
+
+class _PooledConnection(sqlite3.Connection):
+    """Connection owned by the module-level pool.
+
+    close() is a no-op so callers written against the old open/close-per-call
+    contract don't tear down the shared handle; the pool closes it at exit.
+    """
+
+    def close(self) -> None:
+        pass
+
 
 def init_db():
     """Initialize database schema"""
+    global FTS_AVAILABLE
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
 
+    had_prompt_indexes = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'idx_prompts_bookmarked_use'"
+    ).fetchone()
+
     cursor.executescript("""
         CREATE TABLE IF NOT EXISTS projects (
             id TEXT PRIMARY KEY,
@@ -99,6 +318,10 @@ def init_db():
         CREATE INDEX IF NOT EXISTS idx_repositories_project ON repositories(project_id);
         CREATE INDEX IF NOT EXISTS idx_sync_errors_project ON task_sync_errors(project_id);
 
+        -- Dashboard queries: ordered index scans instead of a sort after the filter
+        CREATE INDEX IF NOT EXISTS idx_tasks_status_started ON tasks(agent_status, started_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_tasks_queued ON tasks(priority, created_at) WHERE agent_status = 'queued';
+
         -- Session analytics tables
         CREATE TABLE IF NOT EXISTS session_logs (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -187,6 +410,83 @@ def init_db():
         CREATE INDEX IF NOT EXISTS idx_session_errors_task ON session_errors(task_id);
         CREATE INDEX IF NOT EXISTS idx_user_prompts_task ON user_prompts(task_id);
         CREATE INDEX IF NOT EXISTS idx_user_prompts_session ON user_prompts(session_log_id);
+        CREATE INDEX IF NOT EXISTS idx_user_prompts_type ON user_prompts(prompt_type);
+
+        -- Analytics roll-ups, maintained by triggers so the dashboard summary
+        -- is a handful of point reads instead of full-table aggregates
+        CREATE TABLE IF NOT EXISTS analytics_totals (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS tool_usage_totals (
+            tool_name TEXT PRIMARY KEY,
+            total INTEGER NOT NULL DEFAULT 0
+        );
+
+        -- Seed from existing rows the first time the roll-ups are created
+        INSERT INTO tool_usage_totals (tool_name, total)
+        SELECT tool_name, SUM(call_count) FROM tool_usage
+        WHERE NOT EXISTS (SELECT 1 FROM analytics_totals)
+        GROUP BY tool_name;
+
+        INSERT INTO analytics_totals (key, value)
+        SELECT key, value FROM (
+            SELECT 'sessions' as key, COUNT(*) as value FROM session_logs
+            UNION ALL SELECT 'tool_calls', COALESCE(SUM(total_tool_calls), 0) FROM session_logs
+            UNION ALL SELECT 'file_operations', COALESCE(SUM(total_file_operations), 0) FROM session_logs
+            UNION ALL SELECT 'commands', COALESCE(SUM(total_commands), 0) FROM session_logs
+            UNION ALL SELECT 'errors', COALESCE(SUM(total_errors), 0) FROM session_logs
+            UNION ALL SELECT 'prompts', COUNT(*) FROM user_prompts
+            UNION ALL SELECT 'prompts_' || prompt_type, COUNT(*) FROM user_prompts GROUP BY prompt_type
+        )
+        WHERE NOT EXISTS (SELECT 1 FROM analytics_totals);
+
+        CREATE TRIGGER IF NOT EXISTS trg_session_logs_totals_insert AFTER INSERT ON session_logs
+        BEGIN
+            INSERT INTO analytics_totals (key, value) VALUES
+                ('sessions', 1),
+                ('tool_calls', COALESCE(NEW.total_tool_calls, 0)),
+                ('file_operations', COALESCE(NEW.total_file_operations, 0)),
+                ('commands', COALESCE(NEW.total_commands, 0)),
+                ('errors', COALESCE(NEW.total_errors, 0))
+            ON CONFLICT(key) DO UPDATE SET value = value + excluded.value;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_session_logs_totals_delete AFTER DELETE ON session_logs
+        BEGIN
+            INSERT INTO analytics_totals (key, value) VALUES
+                ('sessions', -1),
+                ('tool_calls', -COALESCE(OLD.total_tool_calls, 0)),
+                ('file_operations', -COALESCE(OLD.total_file_operations, 0)),
+                ('commands', -COALESCE(OLD.total_commands, 0)),
+                ('errors', -COALESCE(OLD.total_errors, 0))
+            ON CONFLICT(key) DO UPDATE SET value = value + excluded.value;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_tool_usage_totals_insert AFTER INSERT ON tool_usage
+        BEGIN
+            INSERT INTO tool_usage_totals (tool_name, total) VALUES (NEW.tool_name, COALESCE(NEW.call_count, 0))
+            ON CONFLICT(tool_name) DO UPDATE SET total = total + excluded.total;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_tool_usage_totals_delete AFTER DELETE ON tool_usage
+        BEGIN
+            UPDATE tool_usage_totals SET total = total - COALESCE(OLD.call_count, 0)
+            WHERE tool_name = OLD.tool_name;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_user_prompts_totals_insert AFTER INSERT ON user_prompts
+        BEGIN
+            INSERT INTO analytics_totals (key, value) VALUES ('prompts', 1), ('prompts_' || NEW.prompt_type, 1)
+            ON CONFLICT(key) DO UPDATE SET value = value + excluded.value;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_user_prompts_totals_delete AFTER DELETE ON user_prompts
+        BEGIN
+            UPDATE analytics_totals SET value = value - 1
+            WHERE key IN ('prompts', 'prompts_' || OLD.prompt_type);
+        END;
 
         -- Prompt library tables
         CREATE TABLE IF NOT EXISTS prompts (
@@ -221,53 +521,283 @@ def init_db():
             FOREIGN KEY (prompt_id) REFERENCES prompts(id)
         );
 
-        CREATE INDEX IF NOT EXISTS idx_prompts_category ON prompts(category);
-        CREATE INDEX IF NOT EXISTS idx_prompts_phase ON prompts(phase);
-        CREATE INDEX IF NOT EXISTS idx_prompts_bookmarked ON prompts(is_bookmarked);
-        CREATE INDEX IF NOT EXISTS idx_prompt_history_task ON prompt_history(task_id);
+        -- Filter column first, then the list order, so the common prompt
+        -- lists are a bounded index range scan that stops at LIMIT
+        CREATE INDEX IF NOT EXISTS idx_prompts_category_updated ON prompts(category, updated_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_prompts_phase_use ON prompts(phase, use_count DESC);
+        CREATE INDEX IF NOT EXISTS idx_prompts_bookmarked_use ON prompts(is_bookmarked, use_count DESC);
+        CREATE INDEX IF NOT EXISTS idx_history_task_sent ON prompt_history(task_id, sent_at DESC);
         CREATE INDEX IF NOT EXISTS idx_prompt_history_sent ON prompt_history(sent_at);
-        CREATE INDEX IF NOT EXISTS idx_prompt_workflows_phase ON prompt_workflows(phase);
+        CREATE INDEX IF NOT EXISTS idx_workflow_phase_order ON prompt_workflows(phase, order_index);
+
+        -- Superseded by the composite indexes above
+        DROP INDEX IF EXISTS idx_prompts_category;
+        DROP INDEX IF EXISTS idx_prompts_phase;
+        DROP INDEX IF EXISTS idx_prompts_bookmarked;
+        DROP INDEX IF EXISTS idx_prompt_history_task;
+        DROP INDEX IF EXISTS idx_prompt_workflows_phase;
+
+        -- Per-text history roll-up for get_recent_prompts(), maintained by
+        -- triggers so "recent unique prompts" reads N index entries instead
+        -- of grouping the whole history
+        CREATE TABLE IF NOT EXISTS prompt_text_stats (
+            prompt_text TEXT PRIMARY KEY,
+            last_sent INTEGER NOT NULL,
+            send_count INTEGER NOT NULL DEFAULT 0
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_prompt_text_stats_last ON prompt_text_stats(last_sent DESC);
+
+        -- Seed from existing history the first time the roll-up is created
+        INSERT INTO prompt_text_stats (prompt_text, last_sent, send_count)
+        SELECT prompt_text, MAX(sent_at), COUNT(*) FROM prompt_history
+        WHERE NOT EXISTS (SELECT 1 FROM prompt_text_stats)
+        GROUP BY prompt_text;
+
+        CREATE TRIGGER IF NOT EXISTS trg_prompt_text_stats_insert AFTER INSERT ON prompt_history
+        BEGIN
+            INSERT INTO prompt_text_stats (prompt_text, last_sent, send_count)
+            VALUES (NEW.prompt_text, NEW.sent_at, 1)
+            ON CONFLICT(prompt_text) DO UPDATE SET
+                last_sent = MAX(last_sent, excluded.last_sent),
+                send_count = send_count + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_prompt_text_stats_delete AFTER DELETE ON prompt_history
+        BEGIN
+            UPDATE prompt_text_stats SET
+                send_count = send_count - 1,
+                last_sent = COALESCE(
+                    (SELECT MAX(sent_at) FROM prompt_history WHERE prompt_text = OLD.prompt_text),
+                    last_sent
+                )
+            WHERE prompt_text = OLD.prompt_text;
+            DELETE FROM prompt_text_stats WHERE prompt_text = OLD.prompt_text AND send_count <= 0;
+        END;
     """)
 
+    had_fts = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'prompts_fts'"
+    ).fetchone()
+    try:
+        cursor.executescript(_SQL_CREATE_PROMPT_FTS)
+    except sqlite3.OperationalError:
+        FTS_AVAILABLE = False
+    else:
+        FTS_AVAILABLE = True
+        if not had_fts:
+            # Index rows written before the FTS tables existed
+            cursor.execute("INSERT INTO prompts_fts (prompts_fts) VALUES ('rebuild')")
+            cursor.execute("INSERT INTO prompt_history_fts (prompt_history_fts) VALUES ('rebuild')")
+
+    # Gather planner statistics the first time so the composite indexes get
+    # picked; close_connections() keeps them fresh with PRAGMA optimize
+    has_stats = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+    ).fetchone()
+    if not has_stats:
+        cursor.execute("ANALYZE")
+    elif not had_prompt_indexes:
+        # Existing database: give the new prompt indexes statistics too
+        cursor.execute("ANALYZE prompts")
+        cursor.execute("ANALYZE prompt_history")
+        cursor.execute("ANALYZE prompt_workflows")
+
     conn.commit()
     conn.close()
 
 
-def get_connection():
-    """Get database connection"""
-    # Always call init_db() - it uses CREATE TABLE IF NOT EXISTS
-    # so it's safe and will add any new tables to existing databases
+def get_connection() -> sqlite3.Connection:
+    """Get the cached database connection for the current thread.
+
+    The connection is opened (and the schema initialized) on first use and
+    then reused for the life of the process. It runs in autocommit mode;
+    use transaction() to group writes.
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and _local.path == DB_PATH:
+        return conn
+
+    # init_db() uses CREATE TABLE IF NOT EXISTS, so it's safe and will add
+    # any new tables to existing databases - run it once per connection
     init_db()
 
-    conn = sqlite3.connect(DB_PATH)
+    # Autocommit: a read holds its snapshot only while its statement is
+    # being stepped, so read-only callers need no commit()/rollback() and
+    # can't pin the WAL on this long-lived connection
+    conn = sqlite3.connect(
+        DB_PATH,
+        factory=_PooledConnection,
+        check_same_thread=False,
+        isolation_level=None,
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
     conn.row_factory = sqlite3.Row
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+    _local.conn = conn
+    _local.path = DB_PATH
+    with _open_connections_lock:
+        _open_connections.append(conn)
+
     return conn
 
 
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    """Run a block of writes inside a single BEGIN IMMEDIATE/COMMIT.
+
+    Nested use joins the enclosing transaction.
+    """
+    conn = get_connection()
+    if conn.in_transaction:
+        yield conn
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+        conn.execute("COMMIT")
+    except BaseException:
+        # Also after a failed COMMIT, so the connection isn't left inside
+        # a transaction that later writes would silently join
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+
+
+def queue_write(sql: str, params: Tuple) -> None:
+    """Queue a write for the background writer instead of committing now.
+
+    Queued statements are committed in order, batched into one transaction
+    per flush (consecutive runs of the same statement go through a single
+    executemany). Use for fire-and-forget writes whose result the caller
+    doesn't need; call flush_writes() before reading them back.
+    """
+    _write_queue.append((sql, params))
+    _ensure_writer()
+
+
+def flush_writes() -> None:
+    """Commit every queued write in a single transaction.
+
+    Also waits for a batch the background writer is committing, so a
+    caller that flushes before reading always sees its own writes.
+    """
+    with _write_flush_lock:
+        writes = []
+        while _write_queue:
+            writes.append(_write_queue.popleft())
+        if not writes:
+            return
+
+        try:
+            try:
+                with transaction() as conn:
+                    for sql, batch in groupby(writes, key=lambda write: write[0]):
+                        conn.executemany(sql, [params for _, params in batch])
+            except sqlite3.Error as e:
+                if _is_busy(e):
+                    raise
+                # Some row can't be written; commit the rest without it
+                _replay_writes(writes)
+        except sqlite3.Error as e:
+            if not _is_busy(e):
+                logger.error("Dropped %d queued writes: %s", len(writes), e)
+                raise
+            # Put the batch back in order so the next flush retries it
+            _write_queue.extendleft(reversed(writes))
+            raise
+        except BaseException:
+            _write_queue.extendleft(reversed(writes))
+            raise
+
+
+def _replay_writes(writes: List[Tuple[str, Tuple]]) -> None:
+    """Commit writes one statement at a time, logging and dropping any that fail.
+
+    A busy or locked database is raised instead, with nothing committed.
+    """
+    with transaction() as conn:
+        for sql, params in writes:
+            try:
+                conn.execute(sql, params)
+            except sqlite3.Error as e:
+                if _is_busy(e):
+                    raise
+                logger.error("Dropped queued write %s %r: %s", ' '.join(sql.split()), params, e)
+
+
+def _is_busy(error: sqlite3.Error) -> bool:
+    """Whether a write failed only because another connection holds a lock"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    code = getattr(error, 'sqlite_errorcode', None)  # Python 3.11+
+    if code is not None:
+        return code & 0xff in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    message = str(error)
+    return 'locked' in message or 'busy' in message
+
+
+def _writer_loop() -> None:
+    """Background thread body: flush queued writes every WRITE_FLUSH_INTERVAL"""
+    while True:
+        time.sleep(WRITE_FLUSH_INTERVAL)
+        try:
+            flush_writes()
+        except sqlite3.Error:
+            # Busy writes were requeued for the next tick; others were
+            # logged and dropped
+            pass
+
+
+def _ensure_writer() -> None:
+    """Start the background writer on first use"""
+    global _writer
+    if _writer is not None:
+        return
+    with _writer_lock:
+        if _writer is None:
+            _writer = threading.Thread(
+                target=_writer_loop, name="agentctl-writer", daemon=True
+            )
+            _writer.start()
+
+
+@atexit.register
+def close_connections() -> None:
+    """Close every pooled connection (registered to run at interpreter exit)"""
+    try:
+        flush_writes()
+    except sqlite3.Error:
+        pass
+
+    # Holding the flush lock keeps the writer thread from using a
+    # connection while it is being closed
+    with _write_flush_lock, _open_connections_lock:
+        for conn in _open_connections:
+            try:
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
+            sqlite3.Connection.close(conn)
+        _open_connections.clear()
+    _local.__dict__.clear()
+
+
 def get_active_agents() -> List[Dict]:
     """Get all active agents"""
     conn = get_connection()
     cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT
-            t.id as task_id,
-            p.name as project,
-            t.agent_status,
-            t.phase,
-            t.agent_type,
-            t.commits,
-            t.tmux_session,
-            CAST((julianday('now') - julianday(t.started_at, 'unixepoch')) * 24 * 60 AS INTEGER) as elapsed_minutes
-        FROM tasks t
-        LEFT JOIN projects p ON t.project_id = p.id
-        WHERE t.agent_status IN ('running', 'blocked')
-        ORDER BY t.started_at DESC
-    """)
+    cursor.execute(_SQL_ACTIVE_AGENTS)
 
+    now = int(time.time())
     agents = []
     for row in cursor.fetchall():
-        elapsed_minutes = row['elapsed_minutes'] or 0
+        started_at = row['started_at']
+        elapsed_minutes = (now - started_at) // 60 if started_at is not None else 0
         elapsed = f"{elapsed_minutes // 60}h {elapsed_minutes % 60}m"
         agents.append({
             'task_id': row['task_id'],
@@ -280,32 +810,17 @@ def get_active_agents() -> List[Dict]:
             'elapsed': elapsed
         })
 
-    conn.close()
     return agents
 
 
-def get_queued_tasks() -> List[Dict]:
+def get_queued_tasks() -> List[sqlite3.Row]:
     """Get queued tasks ordered by priority"""
     conn = get_connection()
     cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT t.id, p.name as project, t.category, t.priority, t.title
-        FROM tasks t
-        LEFT JOIN projects p ON t.project_id = p.id
-        WHERE t.agent_status = 'queued'
-        ORDER BY
-            CASE t.priority
-                WHEN 'high' THEN 1
-                WHEN 'medium' THEN 2
-                WHEN 'low' THEN 3
-            END,
-            t.created_at ASC
-    """)
+    cursor.execute(_SQL_QUEUED_TASKS)
 
-    tasks = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return tasks
+    return cursor.fetchall()
 
 
 def query_tasks(
@@ -317,83 +832,54 @@ def query_tasks(
     conn = get_connection()
     cursor = conn.cursor()
 
-    conditions = []
-    params = []
-
-    if agent_status:
-        conditions.append("t.agent_status = ?")
-        params.append(agent_status)
-    if priority:
-        conditions.append("t.priority = ?")
-        params.append(priority)
-    if project:
-        conditions.append("t.project_id = ?")
-        params.append(project)
-
-    where_clause = " AND ".join(conditions) if conditions else "1=1"
+    mask = bool(agent_status) | (bool(priority) << 1) | (bool(project) << 2)
+    params = tuple(value for value in (agent_status, priority, project) if value)
 
-    cursor.execute(f"""
-        SELECT
-            t.id as task_id,
-            t.title,
-            t.agent_status,
-            t.priority,
-            t.phase,
-            CAST((julianday('now') - julianday(t.started_at, 'unixepoch')) * 24 * 60 AS INTEGER) as waiting_minutes
-        FROM tasks t
-        WHERE {where_clause}
-        ORDER BY t.created_at DESC
-    """, params)
+    cursor.execute(_QUERY_TASKS_SQL[mask], params)
 
+    now = int(time.time())
     tasks = []
     for row in cursor.fetchall():
         task = dict(row)
+        started_at = task.pop('started_at')
+        task['waiting_minutes'] = (now - started_at) // 60 if started_at is not None else None
         if task['waiting_minutes']:
             task['waiting_time'] = f"{task['waiting_minutes'] // 60}h {task['waiting_minutes'] % 60}m"
         else:
             task['waiting_time'] = None
         tasks.append(task)
 
-    conn.close()
     return tasks
 
 
 def add_event(task_id: str, event_type: str, data: Optional[Dict] = None):
-    """Add an event to the log"""
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        INSERT INTO events (task_id, event_type, timestamp, data)
-        VALUES (?, ?, ?, ?)
-    """, (task_id, event_type, int(datetime.now().timestamp()), json.dumps(data or {})))
+    """Add an event to the log.
 
-    conn.commit()
-    conn.close()
+    The row is queued and written by a background thread in batches; call
+    flush_writes() to force it out immediately.
+    """
+    queue_write(_SQL_INSERT_EVENT, (task_id, event_type, int(time.time()), json.dumps(data or {})))
 
 
 def get_recent_events(limit: int = 10) -> List[Dict]:
-    """Get recent events"""
+    """Get recent events (timestamps are unix seconds)"""
+    # Make sure events queued by this process are visible
+    flush_writes()
+
     conn = get_connection()
     cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT task_id, event_type, timestamp, data
-        FROM events
-        ORDER BY timestamp DESC
-        LIMIT ?
-    """, (limit,))
+    cursor.execute(_SQL_RECENT_EVENTS, (limit,))
 
     events = []
     for row in cursor.fetchall():
         events.append({
             'task_id': row['task_id'],
             'type': row['event_type'],
-            'timestamp': datetime.fromtimestamp(row['timestamp']),
+            'timestamp': row['timestamp'],
             'data': json.loads(row['data'])
         })
 
-    conn.close()
     return events
 
 
@@ -408,16 +894,11 @@ def create_task(
     repository_id: Optional[str] = None
 ) -> None:
     """Create a new task in the database"""
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        INSERT INTO tasks (id, project_id, repository_id, category, type, title, description, priority, created_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (task_id, project_id, repository_id, category, task_type, title, description, priority, int(datetime.now().timestamp())))
-
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("""
+            INSERT INTO tasks (id, project_id, repository_id, category, type, title, description, priority, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (task_id, project_id, repository_id, category, task_type, title, description, priority, int(time.time())))
 
 
 def get_task(task_id: str) -> Optional[Dict]:
@@ -427,16 +908,12 @@ def get_task(task_id: str) -> Optional[Dict]:
 
     cursor.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
     row = cursor.fetchone()
-    conn.close()
 
     return dict(row) if row else None
 
 
 def update_task_status(task_id: str, agent_status: str, **kwargs):
     """Update task agent_status and optional fields"""
-    conn = get_connection()
-    cursor = conn.cursor()
-
     set_clauses = ["agent_status = ?"]
     params = [agent_status]
 
@@ -447,19 +924,13 @@ def update_task_status(task_id: str, agent_status: str, **kwargs):
     params.append(task_id)
 
     query = f"UPDATE tasks SET {', '.join(set_clauses)} WHERE id = ?"
-    cursor.execute(query, params)
-
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute(query, params)
 
 
 def update_task(task_id: str, **fields) -> None:
     """Update task fields (any provided fields are updated)"""
-    conn = get_connection()
-    cursor = conn.cursor()
-
     if not fields:
-        conn.close()
         return
 
     set_clauses = []
@@ -472,21 +943,14 @@ def update_task(task_id: str, **fields) -> None:
     params.append(task_id)
 
     query = f"UPDATE tasks SET {', '.join(set_clauses)} WHERE id = ?"
-    cursor.execute(query, params)
-
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute(query, params)
 
 
 def delete_task(task_id: str) -> None:
     """Delete a task"""
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
 
 
 def list_all_tasks(agent_status: Optional[str] = None, priority: Optional[str] = None) -> List[Dict]:
@@ -538,7 +1002,6 @@ def list_all_tasks(agent_status: Optional[str] = None, priority: Optional[str] =
     """, params)
 
     tasks = [dict(row) for row in cursor.fetchall()]
-    conn.close()
 
     return tasks
 
@@ -562,7 +1025,6 @@ def get_task_with_details(task_id: str) -> Optional[Dict]:
     """, (task_id,))
 
     row = cursor.fetchone()
-    conn.close()
 
     return dict(row) if row else None
 
@@ -576,16 +1038,11 @@ def create_project(
     tasks_path: Optional[str] = None
 ) -> None:
     """Create a new project"""
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        INSERT INTO projects (id, name, description, tasks_path, created_at)
-        VALUES (?, ?, ?, ?, ?)
-    """, (project_id, name, description, tasks_path, int(datetime.now().timestamp())))
-
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("""
+            INSERT INTO projects (id, name, description, tasks_path, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (project_id, name, description, tasks_path, int(time.time())))
 
 
 def get_project(project_id: str) -> Optional[Dict]:
@@ -595,7 +1052,6 @@ def get_project(project_id: str) -> Optional[Dict]:
 
     cursor.execute("SELECT * FROM projects WHERE id = ?", (project_id,))
     row = cursor.fetchone()
-    conn.close()
 
     return dict(row) if row else None
 
@@ -607,7 +1063,6 @@ def list_projects() -> List[Dict]:
 
     cursor.execute("SELECT * FROM projects ORDER BY created_at DESC")
     projects = [dict(row) for row in cursor.fetchall()]
-    conn.close()
 
     return projects
 
@@ -620,9 +1075,6 @@ def update_project(
     tasks_path: Optional[str] = None
 ) -> None:
     """Update project fields (only provided fields are updated)"""
-    conn = get_connection()
-    cursor = conn.cursor()
-
     updates = []
     params = []
 
@@ -640,15 +1092,12 @@ def update_project(
         params.append(tasks_path)
 
     if not updates:
-        conn.close()
         return
 
     params.append(project_id)
     query = f"UPDATE projects SET {', '.join(updates)} WHERE id = ?"
-    cursor.execute(query, params)
-
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute(query, params)
 
 
 # Repository management functions
@@ -661,16 +1110,11 @@ def create_repository(
     default_branch: str = "main"
 ) -> None:
     """Create a new repository"""
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        INSERT INTO repositories (id, project_id, name, path, default_branch, created_at)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (repository_id, project_id, name, path, default_branch, int(datetime.now().timestamp())))
-
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("""
+            INSERT INTO repositories (id, project_id, name, path, default_branch, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (repository_id, project_id, name, path, default_branch, int(time.time())))
 
 
 def get_repository(repository_id: str) -> Optional[Dict]:
@@ -680,7 +1124,6 @@ def get_repository(repository_id: str) -> Optional[Dict]:
 
     cursor.execute("SELECT * FROM repositories WHERE id = ?", (repository_id,))
     row = cursor.fetchone()
-    conn.close()
 
     return dict(row) if row else None
 
@@ -700,7 +1143,6 @@ def list_repositories(project_id: Optional[str] = None) -> List[Dict]:
         cursor.execute("SELECT * FROM repositories ORDER BY created_at DESC")
 
     repositories = [dict(row) for row in cursor.fetchall()]
-    conn.close()
 
     return repositories
 
@@ -712,9 +1154,6 @@ def update_repository(
     default_branch: Optional[str] = None
 ) -> None:
     """Update repository fields (only provided fields are updated)"""
-    conn = get_connection()
-    cursor = conn.cursor()
-
     updates = []
     params = []
 
@@ -729,31 +1168,23 @@ def update_repository(
         params.append(default_branch)
 
     if not updates:
-        conn.close()
         return
 
     params.append(repository_id)
     query = f"UPDATE repositories SET {', '.join(updates)} WHERE id = ?"
-    cursor.execute(query, params)
-
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute(query, params)
 
 
 # Task sync error management functions
 
 def add_sync_error(project_id: str, file_path: str, error_message: str) -> None:
     """Add a task sync error"""
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        INSERT INTO task_sync_errors (project_id, file_path, error_message, timestamp)
-        VALUES (?, ?, ?, ?)
-    """, (project_id, file_path, error_message, int(datetime.now().timestamp())))
-
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("""
+            INSERT INTO task_sync_errors (project_id, file_path, error_message, timestamp)
+            VALUES (?, ?, ?, ?)
+        """, (project_id, file_path, error_message, int(time.time())))
 
 
 def get_sync_errors(project_id: Optional[str] = None) -> List[Dict]:
@@ -771,23 +1202,17 @@ def get_sync_errors(project_id: Optional[str] = None) -> List[Dict]:
         cursor.execute("SELECT * FROM task_sync_errors ORDER BY timestamp DESC")
 
     errors = [dict(row) for row in cursor.fetchall()]
-    conn.close()
 
     return errors
 
 
 def clear_sync_errors(project_id: Optional[str] = None) -> None:
     """Clear sync errors, optionally for a specific project"""
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    if project_id:
-        cursor.execute("DELETE FROM task_sync_errors WHERE project_id = ?", (project_id,))
-    else:
-        cursor.execute("DELETE FROM task_sync_errors")
-
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        if project_id:
+            conn.execute("DELETE FROM task_sync_errors WHERE project_id = ?", (project_id,))
+        else:
+            conn.execute("DELETE FROM task_sync_errors")
 
 
 # Session analytics functions
@@ -809,68 +1234,67 @@ def save_session_analytics(
     Returns:
         session_log_id for the inserted record
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    global _analytics_version
+    now = int(time.time())
 
-    now = int(datetime.now().timestamp())
+    with transaction() as conn:
+        cursor = conn.cursor()
 
-    # Insert session log
-    cursor.execute("""
-        INSERT INTO session_logs (
-            task_id, session_name, log_file, captured_at, parsed_at,
-            total_tool_calls, total_file_operations, total_commands, total_errors,
-            tool_counts, files_read, files_written, files_edited
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        task_id, session_name, log_file, now, now,
-        metrics.total_tool_calls, metrics.total_file_operations,
-        metrics.total_commands, metrics.total_errors,
-        json.dumps(metrics.tool_counts),
-        json.dumps(metrics.files_read),
-        json.dumps(metrics.files_written),
-        json.dumps(metrics.files_edited)
-    ))
-
-    session_log_id = cursor.lastrowid
-
-    # Insert tool usage
-    for tool_name, count in metrics.tool_counts.items():
+        # Insert session log
         cursor.execute("""
-            INSERT INTO tool_usage (session_log_id, task_id, tool_name, call_count)
-            VALUES (?, ?, ?, ?)
-        """, (session_log_id, task_id, tool_name, count))
-
-    # Insert file operations
-    for op in metrics.file_operations:
-        cursor.execute("""
-            INSERT INTO file_operations (session_log_id, task_id, file_path, operation, lines_affected)
-            VALUES (?, ?, ?, ?, ?)
-        """, (session_log_id, task_id, op.file_path, op.operation, op.lines_affected))
-
-    # Insert commands
-    for cmd in metrics.commands:
-        cursor.execute("""
-            INSERT INTO command_executions (session_log_id, task_id, command, exit_code, duration_ms)
-            VALUES (?, ?, ?, ?, ?)
-        """, (session_log_id, task_id, cmd.command, cmd.exit_code, cmd.duration_ms))
-
-    # Insert errors
-    for err in metrics.errors:
-        cursor.execute("""
-            INSERT INTO session_errors (session_log_id, task_id, error_type, error_message, resolved)
-            VALUES (?, ?, ?, ?, ?)
-        """, (session_log_id, task_id, err.error_type, err.message, 1 if err.resolved else 0))
-
-    # Insert user prompts
-    for prompt in metrics.user_prompts:
-        cursor.execute("""
-            INSERT INTO user_prompts (session_log_id, task_id, prompt, prompt_type, prompt_order)
-            VALUES (?, ?, ?, ?, ?)
-        """, (session_log_id, task_id, prompt.prompt, prompt.prompt_type, prompt.order))
-
-    conn.commit()
-    conn.close()
-
+            INSERT INTO session_logs (
+                task_id, session_name, log_file, captured_at, parsed_at,
+                total_tool_calls, total_file_operations, total_commands, total_errors,
+                tool_counts, files_read, files_written, files_edited
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            task_id, session_name, log_file, now, now,
+            metrics.total_tool_calls, metrics.total_file_operations,
+            metrics.total_commands, metrics.total_errors,
+            json.dumps(metrics.tool_counts),
+            json.dumps(metrics.files_read),
+            json.dumps(metrics.files_written),
+            json.dumps(metrics.files_edited)
+        ))
+
+        session_log_id = cursor.lastrowid
+
+        # Insert tool usage
+        for tool_name, count in metrics.tool_counts.items():
+            cursor.execute("""
+                INSERT INTO tool_usage (session_log_id, task_id, tool_name, call_count)
+                VALUES (?, ?, ?, ?)
+            """, (session_log_id, task_id, tool_name, count))
+
+        # Insert file operations
+        for op in metrics.file_operations:
+            cursor.execute("""
+                INSERT INTO file_operations (session_log_id, task_id, file_path, operation, lines_affected)
+                VALUES (?, ?, ?, ?, ?)
+            """, (session_log_id, task_id, op.file_path, op.operation, op.lines_affected))
+
+        # Insert commands
+        for cmd in metrics.commands:
+            cursor.execute("""
+                INSERT INTO command_executions (session_log_id, task_id, command, exit_code, duration_ms)
+                VALUES (?, ?, ?, ?, ?)
+            """, (session_log_id, task_id, cmd.command, cmd.exit_code, cmd.duration_ms))
+
+        # Insert errors
+        for err in metrics.errors:
+            cursor.execute("""
+                INSERT INTO session_errors (session_log_id, task_id, error_type, error_message, resolved)
+                VALUES (?, ?, ?, ?, ?)
+            """, (session_log_id, task_id, err.error_type, err.message, 1 if err.resolved else 0))
+
+        # Insert user prompts
+        for prompt in metrics.user_prompts:
+            cursor.execute("""
+                INSERT INTO user_prompts (session_log_id, task_id, prompt, prompt_type, prompt_order)
+                VALUES (?, ?, ?, ?, ?)
+            """, (session_log_id, task_id, prompt.prompt, prompt.prompt_type, prompt.order))
+
+    _analytics_version += 1
     return session_log_id
 
 
@@ -899,18 +1323,17 @@ def get_session_logs_for_task(task_id: str) -> List[Dict]:
             log['files_edited'] = json.loads(log['files_edited'])
         logs.append(log)
 
-    conn.close()
     return logs
 
 
-def get_tool_usage_stats(task_id: Optional[str] = None) -> List[Dict]:
+def get_tool_usage_stats(task_id: Optional[str] = None) -> List[sqlite3.Row]:
     """Get aggregated tool usage statistics.
 
     Args:
         task_id: Optional task ID to filter by
 
     Returns:
-        List of dicts with tool_name and total usage counts
+        List of rows with tool_name and total usage counts
     """
     conn = get_connection()
     cursor = conn.cursor()
@@ -931,12 +1354,10 @@ def get_tool_usage_stats(task_id: Optional[str] = None) -> List[Dict]:
             ORDER BY total_calls DESC
         """)
 
-    stats = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return stats
+    return cursor.fetchall()
 
 
-def get_file_activity_stats(task_id: Optional[str] = None, limit: int = 20) -> List[Dict]:
+def get_file_activity_stats(task_id: Optional[str] = None, limit: int = 20) -> List[sqlite3.Row]:
     """Get most frequently accessed files.
 
     Args:
@@ -944,7 +1365,7 @@ def get_file_activity_stats(task_id: Optional[str] = None, limit: int = 20) -> L
         limit: Maximum number of files to return
 
     Returns:
-        List of dicts with file_path, operation counts
+        List of rows with file_path, operation counts
     """
     conn = get_connection()
     cursor = conn.cursor()
@@ -975,19 +1396,17 @@ def get_file_activity_stats(task_id: Optional[str] = None, limit: int = 20) -> L
             LIMIT ?
         """, (limit,))
 
-    stats = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return stats
+    return cursor.fetchall()
 
 
-def get_error_stats(task_id: Optional[str] = None) -> List[Dict]:
+def get_error_stats(task_id: Optional[str] = None) -> List[sqlite3.Row]:
     """Get error statistics by type.
 
     Args:
         task_id: Optional task ID to filter by
 
     Returns:
-        List of dicts with error_type and count
+        List of rows with error_type and count
     """
     conn = get_connection()
     cursor = conn.cursor()
@@ -1008,12 +1427,10 @@ def get_error_stats(task_id: Optional[str] = None) -> List[Dict]:
             ORDER BY count DESC
         """)
 
-    stats = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return stats
+    return cursor.fetchall()
 
 
-def get_user_prompts(task_id: Optional[str] = None, limit: int = 50) -> List[Dict]:
+def get_user_prompts(task_id: Optional[str] = None, limit: int = 50) -> List[sqlite3.Row]:
     """Get user prompts, optionally filtered by task.
 
     Args:
@@ -1021,7 +1438,7 @@ def get_user_prompts(task_id: Optional[str] = None, limit: int = 50) -> List[Dic
         limit: Maximum number of prompts to return
 
     Returns:
-        List of dicts with prompt info
+        List of rows with prompt info
     """
     conn = get_connection()
     cursor = conn.cursor()
@@ -1044,9 +1461,9 @@ def get_user_prompts(task_id: Optional[str] = None, limit: int = 50) -> List[Dic
             LIMIT ?
         """, (limit,))
 
-    prompts = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return prompts
+    # sqlite3.Row already supports row['column'] access; no need to copy
+    # every row into a dict
+    return cursor.fetchall()
 
 
 def get_user_prompt_stats(task_id: Optional[str] = None) -> Dict:
@@ -1061,113 +1478,64 @@ def get_user_prompt_stats(task_id: Optional[str] = None) -> Dict:
     conn = get_connection()
     cursor = conn.cursor()
 
+    # Group on the small prompt_type domain and pivot in Python
     if task_id:
         cursor.execute("""
-            SELECT
-                COUNT(*) as total_prompts,
-                SUM(CASE WHEN prompt_type = 'message' THEN 1 ELSE 0 END) as messages,
-                SUM(CASE WHEN prompt_type = 'command' THEN 1 ELSE 0 END) as commands,
-                SUM(CASE WHEN prompt_type = 'file_reference' THEN 1 ELSE 0 END) as file_refs,
-                SUM(CASE WHEN prompt_type = 'interrupt' THEN 1 ELSE 0 END) as interrupts
+            SELECT prompt_type, COUNT(*) as count
             FROM user_prompts
             WHERE task_id = ?
+            GROUP BY prompt_type
         """, (task_id,))
     else:
         cursor.execute("""
-            SELECT
-                COUNT(*) as total_prompts,
-                SUM(CASE WHEN prompt_type = 'message' THEN 1 ELSE 0 END) as messages,
-                SUM(CASE WHEN prompt_type = 'command' THEN 1 ELSE 0 END) as commands,
-                SUM(CASE WHEN prompt_type = 'file_reference' THEN 1 ELSE 0 END) as file_refs,
-                SUM(CASE WHEN prompt_type = 'interrupt' THEN 1 ELSE 0 END) as interrupts
+            SELECT prompt_type, COUNT(*) as count
             FROM user_prompts
+            GROUP BY prompt_type
         """)
 
-    row = cursor.fetchone()
-    conn.close()
+    counts = {row['prompt_type']: row['count'] for row in cursor.fetchall()}
 
     return {
-        'total_prompts': row['total_prompts'] or 0,
-        'messages': row['messages'] or 0,
-        'commands': row['commands'] or 0,
-        'file_references': row['file_refs'] or 0,
-        'interrupts': row['interrupts'] or 0,
+        'total_prompts': sum(counts.values()),
+        'messages': counts.get('message', 0),
+        'commands': counts.get('command', 0),
+        'file_references': counts.get('file_reference', 0),
+        'interrupts': counts.get('interrupt', 0),
     }
 
 
 def get_analytics_summary() -> Dict:
     """Get overall analytics summary across all sessions."""
+    global _analytics_cache
+    now = time.monotonic()
+    cached = _analytics_cache
+    if cached and cached[0] == _analytics_version and now - cached[1] < ANALYTICS_SUMMARY_TTL:
+        return copy.deepcopy(cached[2])
+    version = _analytics_version
+
     conn = get_connection()
     cursor = conn.cursor()
 
-    # Total sessions
-    cursor.execute("SELECT COUNT(*) as count FROM session_logs")
-    total_sessions = cursor.fetchone()['count']
-
-    # Total metrics
-    cursor.execute("""
-        SELECT
-            SUM(total_tool_calls) as total_tools,
-            SUM(total_file_operations) as total_files,
-            SUM(total_commands) as total_commands,
-            SUM(total_errors) as total_errors
-        FROM session_logs
-    """)
+    # Totals come from the trigger-maintained roll-up tables; the "recent"
+    # lists come back as JSON arrays so the summary is a single result row
+    cursor.execute(_SQL_ANALYTICS_SUMMARY)
     row = cursor.fetchone()
-
-    # Top tools
-    cursor.execute("""
-        SELECT tool_name, SUM(call_count) as total
-        FROM tool_usage
-        GROUP BY tool_name
-        ORDER BY total DESC
-        LIMIT 5
-    """)
-    top_tools = [dict(r) for r in cursor.fetchall()]
-
-    # Recent errors
-    cursor.execute("""
-        SELECT task_id, error_type, error_message
-        FROM session_errors
-        ORDER BY id DESC
-        LIMIT 5
-    """)
-    recent_errors = [dict(r) for r in cursor.fetchall()]
-
-    # User prompt stats
-    cursor.execute("""
-        SELECT
-            COUNT(*) as total_prompts,
-            SUM(CASE WHEN prompt_type = 'message' THEN 1 ELSE 0 END) as messages,
-            SUM(CASE WHEN prompt_type = 'command' THEN 1 ELSE 0 END) as commands,
-            SUM(CASE WHEN prompt_type = 'file_reference' THEN 1 ELSE 0 END) as file_refs
-        FROM user_prompts
-    """)
-    prompt_row = cursor.fetchone()
-
-    # Recent user prompts
-    cursor.execute("""
-        SELECT task_id, prompt, prompt_type
-        FROM user_prompts
-        WHERE prompt_type = 'message'
-        ORDER BY id DESC
-        LIMIT 10
-    """)
-    recent_prompts = [dict(r) for r in cursor.fetchall()]
-
-    conn.close()
-
-    return {
-        'total_sessions': total_sessions,
-        'total_tool_calls': row['total_tools'] or 0,
-        'total_file_operations': row['total_files'] or 0,
-        'total_commands': row['total_commands'] or 0,
-        'total_errors': row['total_errors'] or 0,
-        'top_tools': top_tools,
-        'recent_errors': recent_errors,
-        'total_user_prompts': prompt_row['total_prompts'] or 0,
-        'prompt_messages': prompt_row['messages'] or 0,
-        'prompt_commands': prompt_row['commands'] or 0,
-        'prompt_file_refs': prompt_row['file_refs'] or 0,
-        'recent_prompts': recent_prompts,
+    totals = json.loads(row['totals'])
+
+    summary = {
+        'total_sessions': totals.get('sessions', 0),
+        'total_tool_calls': totals.get('tool_calls', 0),
+        'total_file_operations': totals.get('file_operations', 0),
+        'total_commands': totals.get('commands', 0),
+        'total_errors': totals.get('errors', 0),
+        'top_tools': json.loads(row['top_tools']),
+        'recent_errors': json.loads(row['recent_errors']),
+        'total_user_prompts': totals.get('prompts', 0),
+        'prompt_messages': totals.get('prompts_message', 0),
+        'prompt_commands': totals.get('prompts_command', 0),
+        'prompt_file_refs': totals.get('prompts_file_reference', 0),
+        'recent_prompts': json.loads(row['recent_prompts']),
     }
+    # Callers get their own copy, so changing one can't alter the cache
+    _analytics_cache = (version, now, summary)
+    return copy.deepcopy(summary)
@@ -1,15 +1,41 @@
 """Git integration for agentctl"""
 
+import time
+from functools import lru_cache
+
 import git
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
+
+# How long a get_current_branch() result is reused before re-reading HEAD
+CURRENT_BRANCH_TTL = 1.0
+
+# Resolved repo path -> (monotonic time, branch name)
+_current_branch_cache: Dict[str, Tuple[float, str]] = {}
+
+
+@lru_cache(maxsize=8)
+def _open_repo(path: Path) -> git.Repo:
+    """Open (and cache) the repository containing a resolved path"""
+    return git.Repo(path, search_parent_directories=True)
 
 
 def get_repo(path: Optional[Path] = None) -> git.Repo:
     """Get git repository"""
     if path is None:
         path = Path.cwd()
-    return git.Repo(path, search_parent_directories=True)
+    return _open_repo(Path(path).resolve())
+
+
+def _get_head(repo: git.Repo, name: str) -> Optional[git.Head]:
+    """Look up a local branch by name without listing every head"""
+    head = git.Head(repo, f"refs/heads/{name}")
+    return head if head.is_valid() else None
+
+
+def _invalidate_current_branch(repo: git.Repo) -> None:
+    """Forget the cached current branch after HEAD moves"""
+    _current_branch_cache.pop(repo.working_dir, None)
 
 
 def create_branch(branch_name: str, base: str = "main", repo_path: Optional[Path] = None) -> str:
@@ -17,18 +43,15 @@ def create_branch(branch_name: str, base: str = "main", repo_path: Optional[Path
     repo = get_repo(repo_path)
 
     # Check if branch exists
-    if branch_name in repo.heads:
+    if _get_head(repo, branch_name) is not None:
         return branch_name
 
-    # Create new branch from base
-    try:
-        base_branch = repo.heads[base]
-    except (IndexError, AttributeError):
-        # Try 'master' if 'main' doesn't exist
-        base_branch = repo.heads.get("master", repo.head)
+    # Create new branch from base, trying 'master' if base doesn't exist
+    base_branch = _get_head(repo, base) or _get_head(repo, "master") or repo.head
 
     new_branch = repo.create_head(branch_name, base_branch)
     new_branch.checkout()
+    _invalidate_current_branch(repo)
 
     return branch_name
 
@@ -36,13 +59,25 @@ def create_branch(branch_name: str, base: str = "main", repo_path: Optional[Path
 def checkout_branch(branch_name: str):
     """Checkout an existing branch"""
     repo = get_repo()
-    repo.heads[branch_name].checkout()
+    head = _get_head(repo, branch_name)
+    if head is None:
+        raise IndexError(f"No branch named {branch_name}")
+    head.checkout()
+    _invalidate_current_branch(repo)
 
 
 def get_current_branch() -> str:
     """Get the current branch name"""
     repo = get_repo()
-    return repo.active_branch.name
+
+    cached = _current_branch_cache.get(repo.working_dir)
+    now = time.monotonic()
+    if cached and now - cached[0] < CURRENT_BRANCH_TTL:
+        return cached[1]
+
+    name = repo.active_branch.name
+    _current_branch_cache[repo.working_dir] = (now, name)
+    return name
 
 
 def merge_branch(branch_name: str, target: str = "main"):
@@ -50,7 +85,11 @@ def merge_branch(branch_name: str, target: str = "main"):
     repo = get_repo()
 
     # Checkout target branch
-    repo.heads[target].checkout()
+    head = _get_head(repo, target)
+    if head is None:
+        raise IndexError(f"No branch named {target}")
+    head.checkout()
+    _invalidate_current_branch(repo)
 
     # Merge the branch
     repo.git.merge(branch_name)
@@ -71,10 +110,12 @@ def delete_branch(branch_name: str, force: bool = False):
 def get_branch_commits(branch_name: str) -> int:
     """Get number of commits on a branch"""
     repo = get_repo()
-    return len(list(repo.iter_commits(branch_name)))
+    return int(repo.git.rev_list('--count', branch_name))
 
 
 def has_uncommitted_changes() -> bool:
     """Check if there are uncommitted changes"""
     repo = get_repo()
-    return repo.is_dirty() or len(repo.untracked_files) > 0
+    # One status call covers staged, unstaged and untracked files
+    status = repo.git.status('--porcelain=v1', '-z', '--untracked-files=normal')
+    return bool(status)
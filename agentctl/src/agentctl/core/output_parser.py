@@ -8,10 +8,15 @@ from typing import List, Optional
 # ANSI escape sequence pattern
 ANSI_PATTERN = re.compile(r'\x1b\[[0-9;]*[a-zA-Z]|\x1b\][^\x07]*\x07|\x1b[()][AB012]')
 
-# Patterns for detecting Claude Code prompts
-PROMPT_QUESTION_PATTERN = re.compile(r'^\s*Do you want to (.+)\?')
-PROMPT_OPTION_PATTERN = re.compile(r'^\s*[>]?\s*(\d+)\.\s+(.+)$')
-SELECTED_OPTION_PATTERN = re.compile(r'^\s*[>❯]\s*(\d+)\.')
+# Pattern for detecting Claude Code prompt lines: either the question
+# ("Do you want to ...?") or a numbered option, optionally marked selected
+# with a leading ">". One match per line tells us which it is.
+PROMPT_LINE_PATTERN = re.compile(
+    r'^\s*(?:'
+    r'Do you want to (?P<question>.+)\?'
+    r'|(?P<selected>>)?\s*(?P<num>\d+)\.\s+(?P<option>.+)$'
+    r')'
+)
 
 # Keywords that indicate destructive operations
 DESTRUCTIVE_KEYWORDS = ["delete", "remove", "overwrite", "destroy", "drop", "truncate", "wipe"]
@@ -42,6 +47,10 @@ def strip_ansi(text: str) -> str:
     Returns:
         Clean text with all ANSI escape sequences removed
     """
+    # Every sequence starts with ESC; most pane lines have none, so skip the
+    # regex engine entirely for them
+    if '\x1b' not in text:
+        return text
     return ANSI_PATTERN.sub('', text)
 
 
@@ -76,6 +85,51 @@ def collapse_whitespace(lines: List[str]) -> List[str]:
     return result
 
 
+class _PromptScanner:
+    """Accumulates prompt question/options as lines are fed in one at a time."""
+
+    def __init__(self):
+        self.question: Optional[str] = None
+        self.options: List[str] = []
+        self.selected_index = 0
+
+    def feed(self, line: str) -> bool:
+        """Scan one line. Returns True if it is a prompt question."""
+        match = PROMPT_LINE_PATTERN.match(line)
+        if not match:
+            return False
+
+        # Question line
+        question = match.group('question')
+        if question is not None:
+            self.question = f"Do you want to {question}?"
+            return True
+
+        # Option line
+        option_text = match.group('option').strip()
+
+        # Truncate long options
+        if len(option_text) > 50:
+            option_text = option_text[:47] + "..."
+
+        self.options.append(option_text)
+
+        # A leading ">" marks the selected option
+        if match.group('selected'):
+            self.selected_index = int(match.group('num')) - 1
+
+        return False
+
+    def result(self) -> Optional[PromptInfo]:
+        if self.question and self.options:
+            return PromptInfo(
+                question=self.question,
+                options=self.options,
+                selected_index=self.selected_index
+            )
+        return None
+
+
 def extract_prompt(lines: List[str]) -> Optional[PromptInfo]:
     """Extract prompt information from Claude Code output.
 
@@ -91,41 +145,10 @@ def extract_prompt(lines: List[str]) -> Optional[PromptInfo]:
     Returns:
         PromptInfo if a prompt is detected, None otherwise
     """
-    question = None
-    options = []
-    selected_index = 0
-
+    scanner = _PromptScanner()
     for line in lines:
-        # Check for question
-        q_match = PROMPT_QUESTION_PATTERN.match(line)
-        if q_match:
-            question = f"Do you want to {q_match.group(1)}?"
-            continue
-
-        # Check for option
-        opt_match = PROMPT_OPTION_PATTERN.match(line)
-        if opt_match:
-            option_num = int(opt_match.group(1))
-            option_text = opt_match.group(2).strip()
-
-            # Truncate long options
-            if len(option_text) > 50:
-                option_text = option_text[:47] + "..."
-
-            options.append(option_text)
-
-            # Check if this option is selected
-            if SELECTED_OPTION_PATTERN.match(line):
-                selected_index = option_num - 1
-
-    if question and options:
-        return PromptInfo(
-            question=question,
-            options=options,
-            selected_index=selected_index
-        )
-
-    return None
+        scanner.feed(line)
+    return scanner.result()
 
 
 def parse_output(raw_text: str, max_lines: int = 4) -> ParsedOutput:
@@ -144,19 +167,38 @@ def parse_output(raw_text: str, max_lines: int = 4) -> ParsedOutput:
     # Split into lines
     raw_lines = raw_text.split('\n')
 
-    # Strip ANSI codes from each line
-    stripped_lines = [strip_ansi(line) for line in raw_lines]
+    # Single pass over the lines: strip ANSI codes, trim trailing whitespace,
+    # collapse blank runs and scan for a prompt (same result as running
+    # strip_ansi, collapse_whitespace and extract_prompt back to back)
+    collapsed_lines = []
+    prev_blank = False
+    question_idx = None
+    scanner = _PromptScanner()
+
+    for line in raw_lines:
+        line = strip_ansi(line).rstrip()
+
+        if not line:
+            if not prev_blank:
+                collapsed_lines.append(line)
+            prev_blank = True
+            continue
+
+        prev_blank = False
+        collapsed_lines.append(line)
+        if scanner.feed(line) and question_idx is None:
+            question_idx = len(collapsed_lines) - 1
 
-    # Collapse whitespace
-    collapsed_lines = collapse_whitespace(stripped_lines)
+    # Remove trailing blank lines
+    while collapsed_lines and collapsed_lines[-1] == "":
+        collapsed_lines.pop()
 
-    # Try to extract prompt
-    prompt = extract_prompt(collapsed_lines)
+    prompt = scanner.result()
 
     # Select which lines to show
     if prompt:
-        # Find prompt start and include it
-        clean_lines = _select_prompt_lines(collapsed_lines, max_lines)
+        # Show from the question onwards
+        clean_lines = collapsed_lines[question_idx:question_idx + max_lines]
     else:
         # Just take the last N non-empty lines
         clean_lines = collapsed_lines[-max_lines:] if collapsed_lines else []
@@ -168,26 +210,6 @@ def parse_output(raw_text: str, max_lines: int = 4) -> ParsedOutput:
     )
 
 
-def _select_prompt_lines(lines: List[str], max_lines: int) -> List[str]:
-    """Select lines that best represent the prompt.
-
-    Prioritizes showing the question and options.
-    """
-    # Find the question line
-    question_idx = None
-    for i, line in enumerate(lines):
-        if PROMPT_QUESTION_PATTERN.match(line):
-            question_idx = i
-            break
-
-    if question_idx is not None:
-        # Return from question onwards, limited to max_lines
-        return lines[question_idx:question_idx + max_lines]
-
-    # Fallback: return last N lines
-    return lines[-max_lines:]
-
-
 def is_destructive_prompt(prompt: PromptInfo) -> bool:
     """Check if a prompt appears to be destructive.
 
@@ -6,13 +6,45 @@ Monitors task state and automatically advances workflow phases based on:
 - agent_review: Detects code review agent process
 """
 
+import re
 from pathlib import Path
 from typing import Optional, Dict
-import subprocess
 
 from agentctl.core import task_md
 from agentctl.core.task_store import get_task, update_task
-from agentctl.core.tmux import session_exists, capture_pane
+from agentctl.core.tmux import session_exists, capture_pane, count_panes
+
+
+# Output indicators of an agent process
+AGENT_INDICATORS = (
+    'claude',           # Claude Code
+    'anthropic',        # Anthropic CLI
+    'codex',           # OpenAI Codex
+    'aider',           # Aider
+    'cursor',          # Cursor
+    'Model:',          # Common prompt header
+    'Assistant:',      # Common chat format
+    'Using tool',      # Tool usage
+    'Running:',        # Command execution
+)
+
+# Output indicators of a code review agent
+REVIEW_INDICATORS = (
+    'code-reviewer',
+    'review',
+    'reviewing',
+    'superpowers:code-reviewer',
+    'code review',
+    'reviewing code',
+    'analysis complete',
+    'review complete',
+)
+
+# Each indicator list as one case-insensitive alternation, so a pane is
+# scanned once without building a lowercased copy and the scan stops at
+# the first hit
+AGENT_PATTERN = re.compile('|'.join(map(re.escape, AGENT_INDICATORS)), re.IGNORECASE)
+REVIEW_PATTERN = re.compile('|'.join(map(re.escape, REVIEW_INDICATORS)), re.IGNORECASE)
 
 
 def check_and_update_phase(task_id: str) -> Optional[str]:
@@ -109,20 +141,7 @@ def _detect_initialization(task: Dict) -> bool:
             return False
 
         # Look for agent process indicators
-        agent_indicators = [
-            'claude',           # Claude Code
-            'anthropic',        # Anthropic CLI
-            'codex',           # OpenAI Codex
-            'aider',           # Aider
-            'cursor',          # Cursor
-            'Model:',          # Common prompt header
-            'Assistant:',      # Common chat format
-            'Using tool',      # Tool usage
-            'Running:',        # Command execution
-        ]
-
-        output_lower = output.lower()
-        return any(indicator.lower() in output_lower for indicator in agent_indicators)
+        return AGENT_PATTERN.search(output) is not None
 
     except Exception:
         return False
@@ -141,17 +160,8 @@ def _detect_agent_review(task: Dict) -> bool:
 
     try:
         # Check if there are multiple panes/windows (indicating review agent)
-        result = subprocess.run(
-            ['tmux', 'list-panes', '-t', tmux_session, '-F', '#{pane_index}'],
-            capture_output=True,
-            text=True,
-            timeout=2
-        )
-
-        if result.returncode == 0:
-            pane_count = len(result.stdout.strip().split('\n'))
-            if pane_count < 2:
-                return False  # Need at least 2 panes for review
+        if count_panes(tmux_session) < 2:
+            return False  # Need at least 2 panes for review
 
         # Capture output from all panes to look for review indicators
         output = capture_pane(tmux_session, lines=50)
@@ -159,19 +169,7 @@ def _detect_agent_review(task: Dict) -> bool:
             return False
 
         # Look for code review indicators
-        review_indicators = [
-            'code-reviewer',
-            'review',
-            'reviewing',
-            'superpowers:code-reviewer',
-            'code review',
-            'reviewing code',
-            'analysis complete',
-            'review complete',
-        ]
-
-        output_lower = output.lower()
-        return any(indicator.lower() in output_lower for indicator in review_indicators)
+        return REVIEW_PATTERN.search(output) is not None
 
     except Exception:
         return False
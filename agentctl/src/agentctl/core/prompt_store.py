@@ -4,11 +4,229 @@ This module provides CRUD operations for the prompt library,
 including saved prompts, history, and workflow suggestions.
 """
 
+import time
 import uuid
-from typing import Dict, List, Optional
+from collections import Counter
+from functools import lru_cache
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
 
-from agentctl.core.database import get_connection
+from agentctl.core import database
+from agentctl.core.database import flush_writes, get_connection, queue_write, transaction
+
+
+# Columns read into Prompt/HistoryEntry rows; queries select exactly these
+# instead of *, so new columns never get pulled into list views
+_PROMPT_FIELDS = ('id', 'text', 'title', 'category', 'tags', 'phase',
+                  'is_bookmarked', 'use_count', 'created_at', 'updated_at')
+_PROMPT_COLUMNS = ", ".join(_PROMPT_FIELDS)
+
+_HISTORY_FIELDS = ('id', 'prompt_id', 'prompt_text', 'task_id', 'phase', 'sent_at')
+
+# Hot statements, kept as module constants (like the ones in database.py)
+# so repeated calls hit the connection's prepared-statement cache
+_SQL_GET_PROMPT = f"SELECT {_PROMPT_COLUMNS} FROM prompts WHERE id = ?"
+
+# History rows are read without joining prompts; the titles/categories of
+# the distinct prompts on a page are fetched in one go by _attach_prompts()
+_SQL_HISTORY_SELECT = f"""
+    SELECT {', '.join('h.' + field for field in _HISTORY_FIELDS)}
+    FROM prompt_history h
+"""
+
+_SQL_HISTORY = _SQL_HISTORY_SELECT + """
+    ORDER BY h.sent_at DESC
+    LIMIT ?
+"""
+
+_SQL_HISTORY_FOR_TASK = _SQL_HISTORY_SELECT + """
+    WHERE h.task_id = ?
+    ORDER BY h.sent_at DESC
+    LIMIT ?
+"""
+
+# Substring-search predicates by mode (see _search_term()); each takes the
+# search term once per column
+_PROMPT_SEARCH_PREDICATES = {
+    'fts': "rowid IN (SELECT rowid FROM prompts_fts WHERE prompts_fts MATCH ?)",
+    'instr': "(instr(lower(text), lower(?)) > 0 OR instr(lower(title), lower(?)) > 0)",
+}
+
+_HISTORY_SEARCH_PREDICATES = {
+    'fts': "h.rowid IN (SELECT rowid FROM prompt_history_fts WHERE prompt_history_fts MATCH ?)",
+    'instr': "instr(lower(h.prompt_text), lower(?)) > 0",
+}
+
+# search_history() statements keyed by (mode, filtered by task)
+_SQL_SEARCH_HISTORY = {
+    (mode, by_task): _SQL_HISTORY_SELECT + f"""
+    WHERE {'h.task_id = ? AND ' if by_task else ''}{predicate}
+    ORDER BY h.sent_at DESC
+    LIMIT ?
+"""
+    for mode, predicate in _HISTORY_SEARCH_PREDICATES.items()
+    for by_task in (False, True)
+}
+
+# list_prompts() filters, in bit order: bit 0 = category, 1 = phase,
+# 2 = bookmark status
+_LIST_PROMPTS_FILTERS = ("category = ?", "phase = ?", "is_bookmarked = ?")
+
+_LIST_PROMPTS_ORDER_COLUMNS = ("updated_at", "use_count", "title", "created_at")
+
+
+@lru_cache(maxsize=None)
+def _list_prompts_sql(mask: int, search_mode: Optional[str], order_by: str, order_desc: bool) -> str:
+    """Build (once) the list_prompts() statement for one filter/order combination.
+
+    The combinations are bounded, so every call after the first reuses the
+    same string and hits the connection's prepared-statement cache.
+    """
+    conditions = [cond for bit, cond in enumerate(_LIST_PROMPTS_FILTERS) if mask & (1 << bit)]
+    if search_mode:
+        conditions.append(_PROMPT_SEARCH_PREDICATES[search_mode])
+    where_clause = " AND ".join(conditions) if conditions else "1=1"
+    return f"""
+        SELECT {_PROMPT_COLUMNS} FROM prompts
+        WHERE {where_clause}
+        ORDER BY {order_by} {'DESC' if order_desc else 'ASC'}
+        LIMIT ?
+    """
+
+
+_SQL_WORKFLOW_PROMPTS = f"""
+    SELECT {', '.join('p.' + field for field in _PROMPT_FIELDS)}
+    FROM prompt_workflows pw
+    JOIN prompts p ON pw.prompt_id = p.id
+    WHERE pw.phase = ?
+    ORDER BY pw.order_index
+"""
+
+_SQL_INSERT_HISTORY = """
+    INSERT INTO prompt_history (id, prompt_id, prompt_text, task_id, phase, sent_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_TOGGLE_BOOKMARK = """
+    UPDATE prompts SET is_bookmarked = CASE WHEN is_bookmarked THEN 0 ELSE 1 END, updated_at = ?
+    WHERE id = ?
+"""
+
+_SQL_ADD_USE_COUNT = "UPDATE prompts SET use_count = use_count + ?, updated_at = ? WHERE id = ?"
+
+# Appends to the end of the phase unless an explicit order_index is given;
+# MAX() over idx_workflow_phase_order is a single index seek
+_SQL_INSERT_WORKFLOW_ENTRY = """
+    INSERT INTO prompt_workflows (id, phase, prompt_id, order_index)
+    SELECT :id, :phase, :prompt_id, COALESCE(:order_index, (
+        SELECT COALESCE(MAX(order_index), -1) + 1 FROM prompt_workflows WHERE phase = :phase
+    ))
+"""
+
+# LIMIT 1 so the statement finishes after the first row instead of staying
+# open on a duplicate membership row
+_SQL_PROMPT_IN_WORKFLOW = "SELECT 1 FROM prompt_workflows WHERE prompt_id = ? AND phase = ? LIMIT 1"
+
+
+# Bumped by writes that change categories or workflow membership; part of
+# the key for the cached lookups below
+_lookup_version = 0
+
+# How long (seconds) the cached lookups can miss a write made by another
+# process before PRAGMA data_version is read again
+LOOKUP_RECHECK_INTERVAL = 1.0
+
+# Connection id -> (monotonic time read, PRAGMA data_version)
+_data_versions: Dict[int, Tuple[float, int]] = {}
+
+
+# Row wrappers
+
+@lru_cache(maxsize=1024)
+def to_datetime(timestamp: int) -> datetime:
+    """Convert a stored epoch-seconds timestamp to a local datetime.
+
+    Memoized: rows written in the same second (bulk sends, a prompt and
+    its first history entry) share one datetime object.
+    """
+    return datetime.fromtimestamp(timestamp)
+
+
+class _LazyRow(Mapping):
+    """Read-only dict view over a database row.
+
+    Columns are converted only when accessed, so a list page that never
+    reads the timestamps never builds datetimes for them. Supports the
+    usual dict reads (``[]``, ``.get()``, iteration); use to_dict() for a
+    plain dict.
+    """
+
+    __slots__ = ('_row',)
+
+    # Keys exposed, in order, and converters for columns that need them
+    _KEYS: Tuple[str, ...] = ()
+    _DECODERS: Dict[str, Callable[[Any], Any]] = {}
+
+    def __init__(self, row):
+        self._row = row
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._KEYS:
+            raise KeyError(key)
+        value = self._row[key]
+        decode = self._DECODERS.get(key)
+        return decode(value) if decode else value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict:
+        """Decode every column into a plain dict."""
+        return {key: self[key] for key in self._KEYS}
+
+
+class Prompt(_LazyRow):
+    """A prompt library entry."""
+
+    __slots__ = ()
+
+    _KEYS = _PROMPT_FIELDS
+    _DECODERS = {
+        'is_bookmarked': bool,
+        'created_at': to_datetime,
+        'updated_at': to_datetime,
+    }
+
+
+class HistoryEntry(_LazyRow):
+    """A prompt history entry, with the library prompt's title/category."""
+
+    __slots__ = ('_prompt',)
+
+    _KEYS = _HISTORY_FIELDS + ('prompt_title', 'prompt_category')
+    _DECODERS = {
+        'sent_at': to_datetime,
+    }
+
+    # Prompt columns served from the attached prompt row
+    _PROMPT_KEYS = {'prompt_title': 'title', 'prompt_category': 'category'}
+
+    def __init__(self, row, prompt=None):
+        super().__init__(row)
+        self._prompt = prompt
+
+    def __getitem__(self, key: str) -> Any:
+        column = self._PROMPT_KEYS.get(key)
+        if column is None:
+            return super().__getitem__(key)
+        return self._prompt[column] if self._prompt is not None else None
 
 
 # Prompt CRUD operations
@@ -34,41 +252,37 @@ def create_prompt(
     Returns:
         The prompt ID
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    prompt_id = str(uuid.uuid4())
-    now = int(datetime.now().timestamp())
+    prompt_id = uuid.uuid4().hex
+    now = int(time.time())
 
-    cursor.execute("""
-        INSERT INTO prompts (id, text, title, category, tags, phase, is_bookmarked, use_count, created_at, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?, ?)
-    """, (prompt_id, text, title, category, tags, phase, 1 if is_bookmarked else 0, now, now))
-
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("""
+            INSERT INTO prompts (id, text, title, category, tags, phase, is_bookmarked, use_count, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?, ?)
+        """, (prompt_id, text, title, category, tags, phase, 1 if is_bookmarked else 0, now, now))
 
+    _invalidate_lookups()
     return prompt_id
 
 
-def get_prompt(prompt_id: str) -> Optional[Dict]:
+def get_prompt(prompt_id: str) -> Optional[Prompt]:
     """Get a prompt by ID.
 
     Args:
         prompt_id: The prompt ID
 
     Returns:
-        Prompt dictionary or None if not found
+        Prompt or None if not found
     """
+    flush_writes()
     conn = get_connection()
     cursor = conn.cursor()
 
-    cursor.execute("SELECT * FROM prompts WHERE id = ?", (prompt_id,))
+    cursor.execute(_SQL_GET_PROMPT, (prompt_id,))
     row = cursor.fetchone()
-    conn.close()
 
     if row:
-        return _row_to_prompt(row)
+        return Prompt(row)
     return None
 
 
@@ -95,11 +309,8 @@ def update_prompt(
     Returns:
         True if updated, False if prompt not found
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
     updates = ["updated_at = ?"]
-    params = [int(datetime.now().timestamp())]
+    params = [int(time.time())]
 
     if text is not None:
         updates.append("text = ?")
@@ -122,12 +333,11 @@ def update_prompt(
 
     params.append(prompt_id)
 
-    cursor.execute(f"UPDATE prompts SET {', '.join(updates)} WHERE id = ?", params)
-
-    updated = cursor.rowcount > 0
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        cursor = conn.execute(f"UPDATE prompts SET {', '.join(updates)} WHERE id = ?", params)
+        updated = cursor.rowcount > 0
 
+    _invalidate_lookups()
     return updated
 
 
@@ -140,15 +350,11 @@ def delete_prompt(prompt_id: str) -> bool:
     Returns:
         True if deleted, False if not found
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("DELETE FROM prompts WHERE id = ?", (prompt_id,))
-
-    deleted = cursor.rowcount > 0
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        cursor = conn.execute("DELETE FROM prompts WHERE id = ?", (prompt_id,))
+        deleted = cursor.rowcount > 0
 
+    _invalidate_lookups()
     return deleted
 
 
@@ -161,26 +367,20 @@ def toggle_bookmark(prompt_id: str) -> Optional[bool]:
     Returns:
         New bookmark status, or None if not found
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    params = (int(time.time()), prompt_id)
 
-    cursor.execute("SELECT is_bookmarked FROM prompts WHERE id = ?", (prompt_id,))
-    row = cursor.fetchone()
+    with transaction() as conn:
+        if database.SUPPORTS_RETURNING:
+            # Flip and read back the new value in one statement
+            row = conn.execute(_SQL_TOGGLE_BOOKMARK + " RETURNING is_bookmarked", params).fetchone()
+        elif conn.execute(_SQL_TOGGLE_BOOKMARK, params).rowcount:
+            row = conn.execute("SELECT is_bookmarked FROM prompts WHERE id = ?", (prompt_id,)).fetchone()
+        else:
+            row = None
 
     if not row:
-        conn.close()
         return None
-
-    new_status = 0 if row['is_bookmarked'] else 1
-
-    cursor.execute("""
-        UPDATE prompts SET is_bookmarked = ?, updated_at = ? WHERE id = ?
-    """, (new_status, int(datetime.now().timestamp()), prompt_id))
-
-    conn.commit()
-    conn.close()
-
-    return bool(new_status)
+    return bool(row['is_bookmarked'])
 
 
 def increment_use_count(prompt_id: str) -> None:
@@ -189,15 +389,26 @@ def increment_use_count(prompt_id: str) -> None:
     Args:
         prompt_id: The prompt ID
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    with transaction() as conn:
+        conn.execute("""
+            UPDATE prompts SET use_count = use_count + 1, updated_at = ? WHERE id = ?
+        """, (int(time.time()), prompt_id))
 
-    cursor.execute("""
-        UPDATE prompts SET use_count = use_count + 1, updated_at = ? WHERE id = ?
-    """, (int(datetime.now().timestamp()), prompt_id))
 
-    conn.commit()
-    conn.close()
+def bulk_increment_use_counts(prompt_ids: Iterable[str]) -> None:
+    """Increment use counts for many prompts in a single transaction.
+
+    Args:
+        prompt_ids: Prompt IDs, once per use (repeats are summed so each
+            prompt is updated once)
+    """
+    use_counts = Counter(prompt_ids)
+    if not use_counts:
+        return
+
+    now = int(time.time())
+    with transaction() as conn:
+        conn.executemany(_SQL_ADD_USE_COUNT, [(count, now, prompt_id) for prompt_id, count in use_counts.items()])
 
 
 # Prompt query operations
@@ -210,7 +421,7 @@ def list_prompts(
     order_by: str = "updated_at",
     order_desc: bool = True,
     limit: int = 100,
-) -> List[Dict]:
+) -> List[Prompt]:
     """List prompts with optional filters.
 
     Args:
@@ -223,64 +434,48 @@ def list_prompts(
         limit: Maximum number of results
 
     Returns:
-        List of prompt dictionaries
+        List of Prompt rows
     """
+    flush_writes()
     conn = get_connection()
     cursor = conn.cursor()
 
-    conditions = []
-    params = []
-
-    if category:
-        conditions.append("category = ?")
-        params.append(category)
-    if phase:
-        conditions.append("phase = ?")
-        params.append(phase)
+    params: List[Any] = [value for value in (category, phase) if value]
     if is_bookmarked is not None:
-        conditions.append("is_bookmarked = ?")
         params.append(1 if is_bookmarked else 0)
-    if search:
-        conditions.append("(text LIKE ? OR title LIKE ?)")
-        search_param = f"%{search}%"
-        params.extend([search_param, search_param])
 
-    where_clause = " AND ".join(conditions) if conditions else "1=1"
+    search_mode = None
+    if search:
+        search_mode, search_param = _search_term(search)
+        params.extend([search_param] * _PROMPT_SEARCH_PREDICATES[search_mode].count("?"))
 
     # Validate order_by to prevent SQL injection
-    valid_order_columns = ["updated_at", "use_count", "title", "created_at"]
-    if order_by not in valid_order_columns:
+    if order_by not in _LIST_PROMPTS_ORDER_COLUMNS:
         order_by = "updated_at"
 
-    order_dir = "DESC" if order_desc else "ASC"
     params.append(limit)
 
-    cursor.execute(f"""
-        SELECT * FROM prompts
-        WHERE {where_clause}
-        ORDER BY {order_by} {order_dir}
-        LIMIT ?
-    """, params)
+    mask = bool(category) | (bool(phase) << 1) | ((is_bookmarked is not None) << 2)
+    cursor.execute(_list_prompts_sql(mask, search_mode, order_by, bool(order_desc)), params)
 
-    prompts = [_row_to_prompt(row) for row in cursor.fetchall()]
-    conn.close()
+    prompts = [Prompt(row) for row in cursor.fetchall()]
 
     return prompts
 
 
-def get_bookmarked_prompts(limit: int = 20) -> List[Dict]:
+def get_bookmarked_prompts(limit: int = 20) -> List[Prompt]:
     """Get bookmarked prompts ordered by use count.
 
     Args:
         limit: Maximum number of results
 
     Returns:
-        List of bookmarked prompt dictionaries
+        List of bookmarked Prompt rows
     """
     return list_prompts(is_bookmarked=True, order_by="use_count", limit=limit)
 
 
-def get_prompts_by_phase(phase: str, limit: int = 20) -> List[Dict]:
+def get_prompts_by_phase(phase: str, limit: int = 20) -> List[Prompt]:
     """Get prompts associated with a workflow phase.
 
     Args:
@@ -288,7 +483,7 @@ def get_prompts_by_phase(phase: str, limit: int = 20) -> List[Dict]:
         limit: Maximum number of results
 
     Returns:
-        List of prompt dictionaries
+        List of Prompt rows
     """
     return list_prompts(phase=phase, order_by="use_count", limit=limit)
 
@@ -299,19 +494,17 @@ def get_categories() -> List[str]:
     Returns:
         List of category names
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    return list(_cached_categories(_lookup_key()))
 
-    cursor.execute("""
+
+@lru_cache(maxsize=8)
+def _cached_categories(key: Tuple[int, int, int]) -> Tuple[str, ...]:
+    cursor = get_connection().execute("""
         SELECT DISTINCT category FROM prompts
         WHERE category IS NOT NULL
         ORDER BY category
     """)
-
-    categories = [row['category'] for row in cursor.fetchall()]
-    conn.close()
-
-    return categories
+    return tuple(row['category'] for row in cursor.fetchall())
 
 
 # Prompt history operations
@@ -330,34 +523,58 @@ def add_to_history(
         phase: Optional phase when sent
         prompt_id: Optional reference to prompts table if from library
 
+    The entry is committed by the background writer along with any other
+    queued writes; this module's readers flush it before querying. An
+    entry that can't be written (e.g. prompt_text None) is logged and
+    dropped there, without holding up other writes.
+
     Returns:
         The history entry ID
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    history_id = uuid.uuid4().hex
+    now = int(time.time())
 
-    history_id = str(uuid.uuid4())
-    now = int(datetime.now().timestamp())
-
-    cursor.execute("""
-        INSERT INTO prompt_history (id, prompt_id, prompt_text, task_id, phase, sent_at)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (history_id, prompt_id, prompt_text, task_id, phase, now))
+    queue_write(_SQL_INSERT_HISTORY, (history_id, prompt_id, prompt_text, task_id, phase, now))
 
-    # If from library, increment use count
+    # If from library, increment use count in the same batch
     if prompt_id:
-        increment_use_count(prompt_id)
-
-    conn.commit()
-    conn.close()
+        queue_write(_SQL_ADD_USE_COUNT, (1, now, prompt_id))
 
     return history_id
 
 
+def bulk_add_to_history(
+    entries: Iterable[Tuple[str, Optional[str], Optional[str], Optional[str]]],
+) -> List[str]:
+    """Add many prompts to history in a single transaction.
+
+    Args:
+        entries: (prompt_text, task_id, phase, prompt_id) tuples, as for
+            add_to_history()
+
+    Returns:
+        The history entry IDs, in input order
+    """
+    now = int(time.time())
+    rows = [
+        (uuid.uuid4().hex, prompt_id, prompt_text, task_id, phase, now)
+        for prompt_text, task_id, phase, prompt_id in entries
+    ]
+
+    if not rows:
+        return []
+
+    with transaction() as conn:
+        conn.executemany(_SQL_INSERT_HISTORY, rows)
+        bulk_increment_use_counts(row[1] for row in rows if row[1])
+
+    return [row[0] for row in rows]
+
+
 def get_history(
     task_id: Optional[str] = None,
     limit: int = 50,
-) -> List[Dict]:
+) -> List[HistoryEntry]:
     """Get prompt history.
 
     Args:
@@ -365,33 +582,18 @@ def get_history(
         limit: Maximum number of results
 
     Returns:
-        List of history entry dictionaries
+        List of HistoryEntry rows
     """
+    flush_writes()
     conn = get_connection()
     cursor = conn.cursor()
 
     if task_id:
-        cursor.execute("""
-            SELECT h.*, p.title as prompt_title, p.category as prompt_category
-            FROM prompt_history h
-            LEFT JOIN prompts p ON h.prompt_id = p.id
-            WHERE h.task_id = ?
-            ORDER BY h.sent_at DESC
-            LIMIT ?
-        """, (task_id, limit))
+        cursor.execute(_SQL_HISTORY_FOR_TASK, (task_id, limit))
     else:
-        cursor.execute("""
-            SELECT h.*, p.title as prompt_title, p.category as prompt_category
-            FROM prompt_history h
-            LEFT JOIN prompts p ON h.prompt_id = p.id
-            ORDER BY h.sent_at DESC
-            LIMIT ?
-        """, (limit,))
-
-    history = [_row_to_history(row) for row in cursor.fetchall()]
-    conn.close()
+        cursor.execute(_SQL_HISTORY, (limit,))
 
-    return history
+    return _attach_prompts(conn, cursor.fetchall())
 
 
 def get_recent_prompts(limit: int = 20) -> List[Dict]:
@@ -403,14 +605,14 @@ def get_recent_prompts(limit: int = 20) -> List[Dict]:
     Returns:
         List of recent prompt dictionaries (deduplicated by text)
     """
+    flush_writes()
     conn = get_connection()
     cursor = conn.cursor()
 
-    # Get recent unique prompts
+    # Get recent unique prompts from the trigger-maintained roll-up
     cursor.execute("""
-        SELECT prompt_text, MAX(sent_at) as last_sent, COUNT(*) as send_count
-        FROM prompt_history
-        GROUP BY prompt_text
+        SELECT prompt_text, last_sent, send_count
+        FROM prompt_text_stats
         ORDER BY last_sent DESC
         LIMIT ?
     """, (limit,))
@@ -419,11 +621,10 @@ def get_recent_prompts(limit: int = 20) -> List[Dict]:
     for row in cursor.fetchall():
         prompts.append({
             'text': row['prompt_text'],
-            'last_sent': datetime.fromtimestamp(row['last_sent']),
+            'last_sent': to_datetime(row['last_sent']),
             'send_count': row['send_count'],
         })
 
-    conn.close()
     return prompts
 
 
@@ -431,7 +632,7 @@ def search_history(
     search: str,
     task_id: Optional[str] = None,
     limit: int = 50,
-) -> List[Dict]:
+) -> List[HistoryEntry]:
     """Search prompt history.
 
     Args:
@@ -440,94 +641,100 @@ def search_history(
         limit: Maximum number of results
 
     Returns:
-        List of matching history entries
+        List of matching HistoryEntry rows
     """
+    flush_writes()
     conn = get_connection()
     cursor = conn.cursor()
 
-    search_param = f"%{search}%"
+    mode, search_param = _search_term(search)
 
     if task_id:
-        cursor.execute("""
-            SELECT h.*, p.title as prompt_title, p.category as prompt_category
-            FROM prompt_history h
-            LEFT JOIN prompts p ON h.prompt_id = p.id
-            WHERE h.task_id = ? AND h.prompt_text LIKE ?
-            ORDER BY h.sent_at DESC
-            LIMIT ?
-        """, (task_id, search_param, limit))
+        cursor.execute(_SQL_SEARCH_HISTORY[mode, True], (task_id, search_param, limit))
     else:
-        cursor.execute("""
-            SELECT h.*, p.title as prompt_title, p.category as prompt_category
-            FROM prompt_history h
-            LEFT JOIN prompts p ON h.prompt_id = p.id
-            WHERE h.prompt_text LIKE ?
-            ORDER BY h.sent_at DESC
-            LIMIT ?
-        """, (search_param, limit))
-
-    history = [_row_to_history(row) for row in cursor.fetchall()]
-    conn.close()
+        cursor.execute(_SQL_SEARCH_HISTORY[mode, False], (search_param, limit))
 
-    return history
+    return _attach_prompts(conn, cursor.fetchall())
 
 
 # Helper functions
 
-def _row_to_prompt(row) -> Dict:
-    """Convert a database row to a prompt dictionary."""
-    return {
-        'id': row['id'],
-        'text': row['text'],
-        'title': row['title'],
-        'category': row['category'],
-        'tags': row['tags'],
-        'phase': row['phase'],
-        'is_bookmarked': bool(row['is_bookmarked']),
-        'use_count': row['use_count'],
-        'created_at': datetime.fromtimestamp(row['created_at']),
-        'updated_at': datetime.fromtimestamp(row['updated_at']),
-    }
+# Prompt ids per IN (...) lookup, well under SQLite's bound-parameter limit
+_PROMPT_LOOKUP_BATCH = 500
 
 
-def _row_to_history(row) -> Dict:
-    """Convert a database row to a history dictionary."""
-    return {
-        'id': row['id'],
-        'prompt_id': row['prompt_id'],
-        'prompt_text': row['prompt_text'],
-        'task_id': row['task_id'],
-        'phase': row['phase'],
-        'sent_at': datetime.fromtimestamp(row['sent_at']),
-        'prompt_title': row.get('prompt_title'),
-        'prompt_category': row.get('prompt_category'),
-    }
+def _attach_prompts(conn, rows: List) -> List[HistoryEntry]:
+    """Wrap history rows, looking up each distinct prompt's title/category once."""
+    prompt_ids = list({row['prompt_id'] for row in rows if row['prompt_id']})
+    prompts = {}
+
+    for start in range(0, len(prompt_ids), _PROMPT_LOOKUP_BATCH):
+        batch = prompt_ids[start:start + _PROMPT_LOOKUP_BATCH]
+        placeholders = ', '.join('?' * len(batch))
+        for prompt in conn.execute(
+            f"SELECT id, title, category FROM prompts WHERE id IN ({placeholders})", batch
+        ):
+            prompts[prompt['id']] = prompt
+
+    return [HistoryEntry(row, prompts.get(row['prompt_id'])) for row in rows]
+
+
+def _lookup_key() -> Tuple[int, int, int]:
+    """Cache key for the read-mostly lookups.
+
+    Changes on any write made through this module (_lookup_version) and,
+    within LOOKUP_RECHECK_INTERVAL, on any commit by another connection or
+    process (PRAGMA data_version, which a connection's own commits don't
+    move). A warm lookup between rechecks runs no SQL at all.
+    """
+    conn = get_connection()
+    now = time.monotonic()
+    checked = _data_versions.get(id(conn))
+    if checked is None or now - checked[0] >= LOOKUP_RECHECK_INTERVAL:
+        checked = (now, conn.execute("PRAGMA data_version").fetchone()[0])
+        _data_versions[id(conn)] = checked
+    return _lookup_version, id(conn), checked[1]
+
+
+def _invalidate_lookups() -> None:
+    """Drop cached lookups after a write that may change them."""
+    global _lookup_version
+    _lookup_version += 1
+
+
+def _search_term(search: str) -> Tuple[str, str]:
+    """Pick how to run a substring search and prepare its parameter.
+
+    Returns (mode, parameter) where mode keys the *_SEARCH_PREDICATES:
+    'fts' with the term quoted as an FTS5 phrase when the trigram index
+    can answer it (FTS5 available, term at least one trigram long);
+    otherwise 'instr' with the raw term, a case-insensitive substring
+    match (SQLite's lower() folds ASCII only). Either way the term is
+    matched literally; % and _ are not wildcards.
+    """
+    if database.FTS_AVAILABLE and len(search) >= 3:
+        return 'fts', '"' + search.replace('"', '""') + '"'
+    return 'instr', search
 
 
 # Workflow operations
 
-def get_workflow_prompts(phase: str) -> List[Dict]:
+def get_workflow_prompts(phase: str) -> List[Prompt]:
     """Get prompts configured for a specific workflow phase.
 
     Args:
         phase: The workflow phase (e.g., "planning", "implementing", "testing")
 
     Returns:
-        List of prompt dictionaries ordered by order_index
+        List of Prompt rows ordered by order_index
     """
+    flush_writes()
     conn = get_connection()
     cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT p.*, pw.order_index
-        FROM prompt_workflows pw
-        JOIN prompts p ON pw.prompt_id = p.id
-        WHERE pw.phase = ?
-        ORDER BY pw.order_index
-    """, (phase,))
+    cursor.execute(_SQL_WORKFLOW_PROMPTS, (phase,))
 
-    prompts = [_row_to_prompt(row) for row in cursor.fetchall()]
-    conn.close()
+    prompts = [Prompt(row) for row in cursor.fetchall()]
 
     return prompts
 
@@ -543,26 +750,14 @@ def add_prompt_to_workflow(prompt_id: str, phase: str, order_index: Optional[int
     Returns:
         The workflow entry ID
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    workflow_id = uuid.uuid4().hex
 
-    # Get next order_index if not specified
-    if order_index is None:
-        cursor.execute("""
-            SELECT COALESCE(MAX(order_index), -1) + 1 FROM prompt_workflows WHERE phase = ?
-        """, (phase,))
-        order_index = cursor.fetchone()[0]
-
-    workflow_id = str(uuid.uuid4())
-
-    cursor.execute("""
-        INSERT INTO prompt_workflows (id, phase, prompt_id, order_index)
-        VALUES (?, ?, ?, ?)
-    """, (workflow_id, phase, prompt_id, order_index))
-
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute(_SQL_INSERT_WORKFLOW_ENTRY, {
+            'id': workflow_id, 'phase': phase, 'prompt_id': prompt_id, 'order_index': order_index,
+        })
 
+    _invalidate_lookups()
     return workflow_id
 
 
@@ -576,17 +771,13 @@ def remove_prompt_from_workflow(prompt_id: str, phase: str) -> bool:
     Returns:
         True if removed, False if not found
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        DELETE FROM prompt_workflows WHERE prompt_id = ? AND phase = ?
-    """, (prompt_id, phase))
-
-    deleted = cursor.rowcount > 0
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        cursor = conn.execute("""
+            DELETE FROM prompt_workflows WHERE prompt_id = ? AND phase = ?
+        """, (prompt_id, phase))
+        deleted = cursor.rowcount > 0
 
+    _invalidate_lookups()
     return deleted
 
 
@@ -596,17 +787,15 @@ def get_workflow_phases() -> List[str]:
     Returns:
         List of phase names
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    return list(_cached_workflow_phases(_lookup_key()))
 
-    cursor.execute("""
+
+@lru_cache(maxsize=8)
+def _cached_workflow_phases(key: Tuple[int, int, int]) -> Tuple[str, ...]:
+    cursor = get_connection().execute("""
         SELECT DISTINCT phase FROM prompt_workflows ORDER BY phase
     """)
-
-    phases = [row['phase'] for row in cursor.fetchall()]
-    conn.close()
-
-    return phases
+    return tuple(row['phase'] for row in cursor.fetchall())
 
 
 def is_prompt_in_workflow(prompt_id: str, phase: str) -> bool:
@@ -619,14 +808,10 @@ def is_prompt_in_workflow(prompt_id: str, phase: str) -> bool:
     Returns:
         True if prompt is in the workflow phase
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT 1 FROM prompt_workflows WHERE prompt_id = ? AND phase = ?
-    """, (prompt_id, phase))
+    return _cached_in_workflow(_lookup_key(), prompt_id, phase)
 
-    exists = cursor.fetchone() is not None
-    conn.close()
 
-    return exists
+@lru_cache(maxsize=256)
+def _cached_in_workflow(key: Tuple[int, int, int], prompt_id: str, phase: str) -> bool:
+    cursor = get_connection().execute(_SQL_PROMPT_IN_WORKFLOW, (prompt_id, phase))
+    return cursor.fetchone() is not None
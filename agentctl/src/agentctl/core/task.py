@@ -3,19 +3,46 @@
 Tasks are stored as markdown files - no SQLite database for task data.
 """
 
+from operator import itemgetter
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Dict, Optional
 from datetime import datetime
 
 import shutil
 
 from agentctl.core import database, task_md
 from agentctl.core import task_store
-from agentctl.core.tmux import create_session, session_exists
+from agentctl.core.tmux import create_session
 from agentctl.core.git import create_branch, get_current_branch
 
 
+# Defaults for optional task fields, and the fields Task copies straight
+# from task data (project_id and title are required)
+_TASK_DEFAULTS = {
+    'repository_id': None,
+    'category': 'FEATURE',
+    'agent_status': 'queued',
+    'priority': 'medium',
+    'phase': None,
+}
+_TASK_FIELDS = itemgetter('project_id', 'repository_id', 'category', 'title', 'agent_status', 'priority', 'phase')
+
+# Git branch prefix by task category (other categories use 'task')
+_CATEGORY_PREFIX = {
+    'FEATURE': 'feature',
+    'BUG': 'bugfix',
+    'REFACTOR': 'refactor',
+}
+
+
 class Task:
+    __slots__ = (
+        'task_id', 'project_id', 'repository_id', 'category', 'title',
+        'agent_status', 'priority', 'phase', 'project_name',
+        'repository_path', 'repository_name', 'default_branch', 'file_path',
+        '_branch', '_tmux_session',
+    )
+
     def __init__(self, task_id: str):
         self.task_id = task_id
         self.load_from_markdown()
@@ -27,13 +54,17 @@ class Task:
         if not task_data:
             raise ValueError(f"Task {self.task_id} not found")
 
-        self.project_id = task_data['project_id']
-        self.repository_id = task_data.get('repository_id')
-        self.category = task_data.get('category', 'FEATURE')
-        self.title = task_data['title']
-        self.agent_status = task_data.get('agent_status', 'queued')
-        self.priority = task_data.get('priority', 'medium')
-        self.phase = task_data.get('phase')
+        (
+            self.project_id, self.repository_id, self.category, self.title,
+            self.agent_status, self.priority, self.phase,
+        ) = _TASK_FIELDS({**_TASK_DEFAULTS, **task_data})
+
+        # Names derived from the task, built once
+        self._branch = f"{_CATEGORY_PREFIX.get(self.category, 'task')}/{self.task_id}"
+        self._tmux_session = f"agent-{self.task_id}"
+
+        # Markdown file the task was loaded from
+        self.file_path = Path(task_data['_file_path']) if task_data.get('_file_path') else None
 
         # Project and repository info from task_store
         self.project_name = task_data.get('project_name', self.project_id)
@@ -50,18 +81,12 @@ class Task:
     @property
     def branch(self) -> str:
         """Git branch name for this task"""
-        prefix = {
-            'FEATURE': 'feature',
-            'BUG': 'bugfix',
-            'REFACTOR': 'refactor'
-        }.get(self.category, 'task')
-
-        return f"{prefix}/{self.task_id}"
+        return self._branch
 
     @property
     def tmux_session(self) -> str:
         """tmux session name for this task"""
-        return f"agent-{self.task_id}"
+        return self._tmux_session
 
     @property
     def workspace_dir(self) -> Path:
@@ -76,23 +101,36 @@ class Task:
         return None
 
 
-def copy_task_file_to_workdir(task_id: str, work_dir: Path) -> Optional[Path]:
+def _maybe_resolve(path: Path) -> Path:
+    """Make a path absolute, skipping resolve() when it already is.
+
+    Repository paths are stored absolute, so this is usually one lstat()
+    rather than resolve()'s walk over every component.
+    """
+    if path.is_absolute() and '..' not in path.parts and not path.is_symlink():
+        return path
+    return path.resolve()
+
+
+def copy_task_file_to_workdir(task_id: str, work_dir: Path, file_path: Optional[Path] = None) -> Optional[Path]:
     """
     Copy source task markdown to TASK.md in working directory.
 
     Args:
         task_id: Task ID
         work_dir: Target working directory
+        file_path: Source task file, if already known (looked up by task_id otherwise)
 
     Returns:
         Path to the created TASK.md, or None if source not found
     """
-    file_path = task_store.get_task_file_path(task_id)
+    file_path = file_path or task_store.get_task_file_path(task_id)
     if not file_path or not file_path.exists():
         return None
 
     dest_path = work_dir / "TASK.md"
-    shutil.copy2(file_path, dest_path)
+    # Contents only: TASK.md needs none of the source's mode or timestamps
+    shutil.copyfile(file_path, dest_path)
     return dest_path
 
 
@@ -102,9 +140,10 @@ def start_task(task_id: str, agent_type: Optional[str] = None, working_dir: Opti
 
     # Use provided working dir or task's workspace
     work_dir = working_dir or task.workspace_dir
-    work_dir = Path(work_dir).resolve()
+    work_dir = _maybe_resolve(Path(work_dir))
 
-    # Create git branch (only if repository is configured)
+    # Create git branch (only if repository is configured) before the tmux
+    # session, so nothing the session's shell runs races the checkout
     if task.repository_path:
         try:
             branch = create_branch(task.branch, base=task.default_branch, repo_path=task.repository_path)
@@ -113,13 +152,14 @@ def start_task(task_id: str, agent_type: Optional[str] = None, working_dir: Opti
     else:
         branch = None
 
-    # Create tmux session
+    # Create tmux session (an existing one is reused)
     try:
         session = create_session(task.tmux_session, work_dir)
     except Exception as e:
         raise RuntimeError(f"Failed to create tmux session: {e}")
 
-    # Update task in markdown file
+    # Update task in markdown file (the one Task was loaded from, so the
+    # task isn't looked up again)
     updates = {
         'agent_status': 'running',
         'phase': 'planning',
@@ -128,10 +168,10 @@ def start_task(task_id: str, agent_type: Optional[str] = None, working_dir: Opti
         'tmux_session': session,
         'agent_type': agent_type or 'claude-code'
     }
-    task_store.update_task(task_id, updates)
+    task_md.update_task_file(task.file_path, updates)
 
     # Copy task file to working directory
-    copy_task_file_to_workdir(task_id, work_dir)
+    copy_task_file_to_workdir(task_id, work_dir, task.file_path)
 
     # Log event
     database.add_event(task_id, 'task_started', {'branch': branch, 'session': session})
@@ -163,12 +203,8 @@ def complete_task(task_id: str):
 
 def get_next_review() -> Optional[Dict]:
     """Get next task needing review"""
-    tasks = task_store.query_tasks(agent_status='blocked')
-
-    if not tasks:
-        return None
-
-    return tasks[0]
+    # The first blocked task; the rest are never read
+    return next(task_store.iter_tasks(agent_status='blocked'), None)
 
 
 # Task operations (all use markdown files)
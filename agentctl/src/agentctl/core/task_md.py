@@ -5,15 +5,57 @@ All frontmatter fields are preserved - only minimal fields are required.
 """
 
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime
+from functools import lru_cache
 import frontmatter
+import os
 import re
+import threading
+import time
+import yaml
 
 
 # Minimal required fields - just enough to identify and display a task
 REQUIRED_FIELDS = ['id', 'title', 'project_id']
 
+# The dumper python-frontmatter uses (libyaml's when PyYAML has it), so
+# write_task_file(), which calls yaml.dump() itself, writes what
+# frontmatter.dumps() would
+_YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+# Parsed task files by path: ((mtime_ns, size), frontmatter, body), oldest
+# entry dropped first once PARSE_CACHE_SIZE files are cached
+_parsed_files: Dict[str, Tuple[Tuple[int, int], Dict, str]] = {}
+PARSE_CACHE_SIZE = 10000
+_parsed_files_lock = threading.Lock()
+
+# Files modified this recently aren't cached: filesystem timestamps can be
+# coarse enough that a quick same-size rewrite keeps the same mtime
+_PARSE_CACHE_SETTLE_NS = 2_000_000_000
+
+# Frontmatter made only of "key: value" lines can skip PyYAML (see
+# _parse_flat_yaml); the value is empty, single-quoted or plain
+_FLAT_YAML_LINE = re.compile(r"([A-Za-z_][\w-]*):(?: +(?:'([^'\n]*(?:''[^'\n]*)*)'|([^\s'\"#&*!|>%@`{}\[\],?:-][^\n]*?)))? *")
+
+# Characters that make YAML read a document differently from a plain
+# line-by-line split, or reject it
+_FLAT_YAML_UNSAFE = re.compile(yaml.reader.Reader.NON_PRINTABLE.pattern + '|[\t\x85\u2028\u2029\ufeff]')
+
+# Plain YAML scalars, by the tag PyYAML resolves them to
+_YAML_STR_TAG = 'tag:yaml.org,2002:str'
+_YAML_NULL_TAG = 'tag:yaml.org,2002:null'
+_YAML_BOOL_TAG = 'tag:yaml.org,2002:bool'
+_YAML_INT_TAG = 'tag:yaml.org,2002:int'
+_DECIMAL_INT = re.compile(r'0|[1-9][0-9]*')
+_PLAIN_WORD = re.compile(r'[\w-]+')
+
+_YAML_HANDLER = frontmatter.default_handlers.YAMLHandler()
+
+# Task ID formats: the usual PROJECT-CATEGORY-NUMBER, or any word/dash ID
+TASK_ID_PATTERN = re.compile(r'^[A-Z]+-[A-Z0-9]+-\d+$')
+LOOSE_TASK_ID_PATTERN = re.compile(r'^[\w-]+$')
+
 # Valid enum values for agentctl-specific fields
 VALID_AGENT_STATUS = ['queued', 'running', 'blocked', 'completed', 'failed', 'paused']
 VALID_PRIORITY = ['high', 'medium', 'low']
@@ -31,14 +73,61 @@ VALID_PHASE = [
     'completed'         # Merged and done
 ]
 
-
-def parse_task_file(file_path: Path, strict: bool = False) -> Tuple[Optional[Dict], Optional[str], List[str]]:
+# Set versions of the above for validation, and each phase's neighbours
+_VALID_AGENT_STATUS = frozenset(VALID_AGENT_STATUS)
+_VALID_PRIORITY = frozenset(VALID_PRIORITY)
+_VALID_CATEGORY = frozenset(VALID_CATEGORY)
+_VALID_PHASE = frozenset(VALID_PHASE)
+_NEXT_PHASE = dict(zip(VALID_PHASE, VALID_PHASE[1:] + [None]))
+_PREVIOUS_PHASE = dict(zip(VALID_PHASE, [None] + VALID_PHASE[:-1]))
+
+# Human-readable phase names (other phases are title-cased)
+_PHASE_DISPLAY_NAMES = {
+    'preparation': 'Preparation',
+    'registered': 'Registered',
+    'agent_created': 'Agent Created',
+    'initialization': 'Initialization',
+    'implementation': 'Implementation',
+    'agent_review': 'Agent Review',
+    'human_review': 'Human Review',
+    'integration_merge': 'Integration Merge',
+    'adhoc_testing': 'Ad-Hoc Testing',
+    'completed': 'Completed'
+}
+
+
+# Obsidian-style 'status' values, by the agent_status they imply
+_STATUS_TO_AGENT_STATUS = {
+    'in-progress': 'running',
+    'in progress': 'running',
+    'active': 'running',
+    'working': 'running',
+    'done': 'completed',
+    'complete': 'completed',
+    'finished': 'completed',
+    'todo': 'queued',
+    'pending': 'queued',
+    'waiting': 'blocked',
+    'blocked': 'blocked',
+    'on-hold': 'blocked',
+    'failed': 'failed',
+    'error': 'failed',
+}
+
+
+def parse_task_file(
+    file_path: Union[str, Path],
+    strict: bool = False,
+    filters: Optional[Dict[str, str]] = None,
+) -> Tuple[Optional[Dict], Optional[str], List[str]]:
     """
     Parse a task markdown file, preserving ALL frontmatter fields.
 
     Args:
-        file_path: Path to the markdown file
+        file_path: Path to the markdown file (str or Path)
         strict: If True, validate agentctl-specific fields. If False, only check required fields.
+        filters: Field values the task must have. A task without them comes
+            back as (None, None, []), often without its YAML being parsed.
 
     Returns:
         Tuple of (task_data dict, markdown body, list of errors)
@@ -47,11 +136,11 @@ def parse_task_file(file_path: Path, strict: bool = False) -> Tuple[Optional[Dic
     errors = []
 
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            post = frontmatter.load(f)
-
-        task_data = dict(post.metadata)
-        body = post.content
+        loaded = _load_task_file(file_path, _filter_needles(filters) if filters else ())
+        if loaded is None:
+            return None, None, []
+        metadata, body = loaded
+        task_data = dict(metadata)
 
         # Validate task data
         validation_errors = validate_task_data(task_data, strict=strict)
@@ -62,6 +151,9 @@ def parse_task_file(file_path: Path, strict: bool = False) -> Tuple[Optional[Dic
         if 'agent_status' not in task_data:
             task_data['agent_status'] = _derive_agent_status(task_data)
 
+        if filters and any(task_data.get(field) != value for field, value in filters.items()):
+            return None, None, []
+
         return task_data, body, []
 
     except FileNotFoundError:
@@ -70,6 +162,132 @@ def parse_task_file(file_path: Path, strict: bool = False) -> Tuple[Optional[Dic
         return None, None, [f"Error parsing file: {str(e)}"]
 
 
+def _load_task_file(file_path: Union[str, Path], needles: List[Tuple[str, ...]] = ()) -> Optional[Tuple[Dict, str]]:
+    """Read a task file's frontmatter and body.
+
+    Reuses the last parse of the file while its mtime and size are
+    unchanged, so listing and updating tasks doesn't re-run YAML on files
+    nobody touched. The frontmatter returned is shared; copy it before
+    changing it.
+
+    A file not parsed before is skipped (None) if, for some group in
+    needles, its lowercased text has none of the group's strings.
+    """
+    key = str(file_path)
+    stat = os.stat(file_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _parsed_files.get(key)
+    if cached and cached[0] == signature:
+        return cached[1], cached[2]
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    # Backslash escapes in double-quoted YAML could spell a value any way
+    if needles and '\\' not in text:
+        lowered = text.lower()
+        if not all(any(needle in lowered for needle in group) for group in needles):
+            return None
+
+    metadata, body = _parse_frontmatter(text)
+
+    with _parsed_files_lock:
+        _parsed_files.pop(key, None)
+        if time.time_ns() - stat.st_mtime_ns > _PARSE_CACHE_SETTLE_NS:
+            if len(_parsed_files) >= PARSE_CACHE_SIZE:
+                del _parsed_files[next(iter(_parsed_files))]
+            _parsed_files[key] = (signature, metadata, body)
+
+    return metadata, body
+
+
+def _parse_frontmatter(text: str) -> Tuple[Dict, str]:
+    """Split a task file into frontmatter and body, as frontmatter.loads() does.
+
+    Flat YAML frontmatter is read by _parse_flat_yaml(); anything else
+    (lists, comments, other formats) goes through python-frontmatter.
+    """
+    text = text.strip()
+    if _YAML_HANDLER.detect(text):
+        try:
+            fm, content = _YAML_HANDLER.split(text)
+        except ValueError:
+            pass
+        else:
+            metadata = _parse_flat_yaml(fm)
+            if metadata is not None:
+                return metadata, content.strip()
+
+    post = frontmatter.loads(text)
+    return post.metadata, post.content
+
+
+def _parse_flat_yaml(fm: str) -> Optional[Dict]:
+    """Read YAML made only of top-level "key: value" lines.
+
+    Handles the scalars task files are written with: strings (plain or
+    single-quoted), null, booleans and decimal integers, resolved with
+    PyYAML's own rules. Returns None for anything else so the caller
+    falls back to PyYAML, which then gives exactly what it always did.
+    """
+    if _FLAT_YAML_UNSAFE.search(fm):
+        return None
+
+    data = {}
+    for line in fm.split('\n'):
+        if not line.strip():
+            continue
+
+        match = _FLAT_YAML_LINE.fullmatch(line)
+        if not match:
+            return None
+
+        key, quoted, plain = match.groups()
+        # frontmatter.Post() takes metadata as keyword arguments
+        if key in ('content', 'handler') or _resolve_plain_yaml(key) != _YAML_STR_TAG:
+            return None
+
+        if quoted is not None:
+            value = quoted.replace("''", "'")
+        elif plain is None:
+            value = None
+        elif ': ' in plain or ' #' in plain or plain.endswith(':'):
+            return None
+        else:
+            tag = _resolve_plain_yaml(plain)
+            if tag == _YAML_STR_TAG:
+                value = plain
+            elif tag == _YAML_NULL_TAG:
+                value = None
+            elif tag == _YAML_BOOL_TAG:
+                value = yaml.constructor.SafeConstructor.bool_values[plain.lower()]
+            elif tag == _YAML_INT_TAG and _DECIMAL_INT.fullmatch(plain):
+                value = int(plain)
+            else:
+                return None
+
+        data[key] = value
+
+    return data
+
+
+@lru_cache(maxsize=1024)
+def _resolve_plain_yaml(value: str) -> str:
+    """Tag PyYAML gives a plain (unquoted) scalar, as yaml.resolver does"""
+    resolvers = yaml.resolver.Resolver.yaml_implicit_resolvers
+    for tag, regexp in resolvers.get(value[:1], []) + resolvers.get(None, []):
+        if regexp.match(value):
+            return tag
+    return _YAML_STR_TAG
+
+
+def forget_task_file(file_path: Union[str, Path]) -> None:
+    """Drop a task file's cached parse (after it is rewritten or deleted)"""
+    with _parsed_files_lock:
+        _parsed_files.pop(str(file_path), None)
+
+
 def _derive_agent_status(data: Dict) -> str:
     """
     Derive agent_status from other fields if not present.
@@ -79,25 +297,8 @@ def _derive_agent_status(data: Dict) -> str:
     # Check for explicit status field (Obsidian compatibility)
     status = data.get('status', '').lower()
     if status:
-        # Map common status values to agent_status
-        status_map = {
-            'in-progress': 'running',
-            'in progress': 'running',
-            'active': 'running',
-            'working': 'running',
-            'done': 'completed',
-            'complete': 'completed',
-            'finished': 'completed',
-            'todo': 'queued',
-            'pending': 'queued',
-            'waiting': 'blocked',
-            'blocked': 'blocked',
-            'on-hold': 'blocked',
-            'failed': 'failed',
-            'error': 'failed',
-        }
-        if status in status_map:
-            return status_map[status]
+        if status in _STATUS_TO_AGENT_STATUS:
+            return _STATUS_TO_AGENT_STATUS[status]
 
     # Check if task has been started
     if data.get('started_at') and not data.get('completed_at'):
@@ -108,6 +309,39 @@ def _derive_agent_status(data: Dict) -> str:
     return 'queued'
 
 
+def _filter_needles(filters: Dict[str, str]) -> List[Tuple[str, ...]]:
+    """Strings a task file's lowercased text must have to match filters.
+
+    One group per filter; a matching file contains at least one string of
+    every group. An agent_status filter also accepts the fields
+    _derive_agent_status() could derive that status from, and adds no
+    group when the status is the one a bare file gets.
+    """
+    groups = []
+    for field, value in filters.items():
+        # Anything else could be folded across lines or quoted differently
+        if not isinstance(value, str) or not _PLAIN_WORD.fullmatch(value):
+            continue
+
+        needles = [value.lower()]
+        if field == 'agent_status':
+            if value == _derive_agent_status({}):
+                continue
+            # Multi-word statuses by their longest word, as they may be folded
+            needles += [
+                max(status.split(), key=len)
+                for status, agent_status in _STATUS_TO_AGENT_STATUS.items()
+                if agent_status == value
+            ]
+            if value == 'running':
+                needles.append('started_at')
+            if value == 'completed':
+                needles.append('completed_at')
+        groups.append(tuple(needles))
+
+    return groups
+
+
 def validate_task_data(data: Dict, strict: bool = False) -> List[str]:
     """
     Validate task frontmatter data.
@@ -134,28 +368,33 @@ def validate_task_data(data: Dict, strict: bool = False) -> List[str]:
 
     # Validate id format (flexible - allow various patterns)
     task_id = str(data['id'])
-    if not re.match(r'^[A-Z]+-[A-Z0-9]+-\d+$', task_id):
+    if not TASK_ID_PATTERN.match(task_id):
         # Try looser pattern
-        if not re.match(r'^[\w-]+$', task_id):
+        if not LOOSE_TASK_ID_PATTERN.match(task_id):
             errors.append(f"Invalid id format: {data['id']}")
 
     if strict:
         # Strict mode: validate agentctl-specific fields
-        if 'agent_status' in data and data['agent_status'] not in VALID_AGENT_STATUS:
+        if 'agent_status' in data and not _is_one_of(data['agent_status'], _VALID_AGENT_STATUS):
             errors.append(f"Invalid agent_status: {data['agent_status']}")
 
-        if 'priority' in data and data['priority'] not in VALID_PRIORITY:
+        if 'priority' in data and not _is_one_of(data['priority'], _VALID_PRIORITY):
             errors.append(f"Invalid priority: {data['priority']}")
 
-        if 'category' in data and data['category'] not in VALID_CATEGORY:
+        if 'category' in data and not _is_one_of(data['category'], _VALID_CATEGORY):
             errors.append(f"Invalid category: {data['category']}")
 
-        if 'phase' in data and data['phase'] is not None and data['phase'] not in VALID_PHASE:
+        if 'phase' in data and data['phase'] is not None and not _is_one_of(data['phase'], _VALID_PHASE):
             errors.append(f"Invalid phase: {data['phase']}")
 
     return errors
 
 
+def _is_one_of(value, valid: frozenset) -> bool:
+    """Check a frontmatter value against a set of strings (it may be a list or dict)"""
+    return isinstance(value, str) and value in valid
+
+
 def write_task_file(file_path: Path, task_data: Dict, body: str = "") -> None:
     """
     Write a task to a markdown file
@@ -168,12 +407,19 @@ def write_task_file(file_path: Path, task_data: Dict, body: str = "") -> None:
     # Ensure parent directory exists
     file_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # Create frontmatter post
-    post = frontmatter.Post(body, **task_data)
+    # The text frontmatter.dumps() would give, without building a Post
+    metadata = yaml.dump(task_data, Dumper=_YAML_DUMPER, default_flow_style=False, allow_unicode=True).strip()
+    data = f"---\n{metadata}\n---\n\n{body}\n".strip().encode('utf-8')
 
-    # Write to file
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(frontmatter.dumps(post))
+    # Write to file, unbuffered: one write() for the whole file
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    forget_task_file(file_path)
 
 
 def generate_task_template(
@@ -249,9 +495,10 @@ def get_next_task_id(tasks_path: Path, project_id: str, category: str) -> str:
 
     # Extract numbers from filenames
     numbers = []
+    file_pattern = _task_file_pattern(project_id, category)
     for file in matching_files:
         # Extract the number from filename like "RRA-API-0053.md"
-        match = re.match(rf'{project_id}-{category}-(\d{{4}})\.md', file.name)
+        match = file_pattern.match(file.name)
         if match:
             numbers.append(int(match.group(1)))
 
@@ -264,6 +511,12 @@ def get_next_task_id(tasks_path: Path, project_id: str, category: str) -> str:
     return f"{project_id}-{category}-{next_num:04d}"
 
 
+@lru_cache(maxsize=128)
+def _task_file_pattern(project_id: str, category: str) -> re.Pattern:
+    """Pattern for a project/category's task file names, capturing the number"""
+    return re.compile(rf'{re.escape(project_id)}-{re.escape(category)}-(\d{{4}})\.md')
+
+
 def update_task_file(file_path: Path, updates: Dict) -> bool:
     """
     Update specific fields in a task file while preserving the body
@@ -299,40 +552,20 @@ def get_phase_display_name(phase: Optional[str]) -> str:
     if not phase:
         return "Not Set"
 
-    phase_names = {
-        'preparation': 'Preparation',
-        'registered': 'Registered',
-        'agent_created': 'Agent Created',
-        'initialization': 'Initialization',
-        'implementation': 'Implementation',
-        'agent_review': 'Agent Review',
-        'human_review': 'Human Review',
-        'integration_merge': 'Integration Merge',
-        'adhoc_testing': 'Ad-Hoc Testing',
-        'completed': 'Completed'
-    }
-    return phase_names.get(phase, phase.title())
+    return _PHASE_DISPLAY_NAMES.get(phase) or phase.title()
 
 
 def get_next_phase(current_phase: Optional[str]) -> Optional[str]:
     """Get the next phase in the workflow"""
-    if not current_phase or current_phase not in VALID_PHASE:
+    if not _is_one_of(current_phase, _VALID_PHASE):
         return VALID_PHASE[0]  # Start at preparation
 
-    current_index = VALID_PHASE.index(current_phase)
-    if current_index < len(VALID_PHASE) - 1:
-        return VALID_PHASE[current_index + 1]
-
-    return None  # Already at final phase
+    return _NEXT_PHASE[current_phase]  # None at the final phase
 
 
 def get_previous_phase(current_phase: Optional[str]) -> Optional[str]:
     """Get the previous phase in the workflow"""
-    if not current_phase or current_phase not in VALID_PHASE:
+    if not _is_one_of(current_phase, _VALID_PHASE):
         return None
 
-    current_index = VALID_PHASE.index(current_phase)
-    if current_index > 0:
-        return VALID_PHASE[current_index - 1]
-
-    return None  # Already at first phase
+    return _PREVIOUS_PHASE[current_phase]  # None at the first phase
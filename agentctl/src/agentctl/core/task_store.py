@@ -4,28 +4,52 @@ This module provides task queries by reading markdown files directly.
 No SQLite database is used for task data - markdown is the single source of truth.
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Dict, List, Optional, Callable
+from typing import Dict, Iterator, List, Optional, Callable, Tuple
 from datetime import datetime
 
 from agentctl.core import database
-from agentctl.core.task_md import parse_task_file
+from agentctl.core.task_md import forget_task_file, parse_task_file, update_task_file
 
 
-def _calculate_elapsed(task_data: Dict) -> None:
-    """Calculate and add elapsed time fields to task data in place."""
+# get_all_tasks() parses files on a thread pool once there are this many,
+# overlapping their reads; below it the pool costs more than it saves
+PARALLEL_PARSE_THRESHOLD = 16
+PARSE_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Queue order by task priority (anything else sorts as medium)
+_PRIORITY_ORDER = {'high': 0, 'medium': 1, 'low': 2}
+
+# Task ID -> markdown file, from the last listing of every project and
+# lookups since; lets path-only lookups skip listing projects. An entry is
+# only used while it still parses as a task.
+_task_file_index: Dict[str, str] = {}
+
+
+@lru_cache(maxsize=1024)
+def _started_at_datetime(started_at) -> datetime:
+    """A task's started_at as a datetime (parsed once per distinct value)"""
+    if isinstance(started_at, str):
+        return datetime.fromisoformat(started_at)
+    return datetime.fromtimestamp(started_at)
+
+
+def _calculate_elapsed(task_data: Dict, now: datetime) -> None:
+    """Calculate and add elapsed time fields to task data in place.
+
+    now is read once by the caller, however many tasks it fills in.
+    """
     started_at = task_data.get('started_at')
     if started_at:
         try:
-            if isinstance(started_at, str):
-                start_dt = datetime.fromisoformat(started_at)
-            else:
-                start_dt = datetime.fromtimestamp(started_at)
-            elapsed = datetime.now() - start_dt
-            hours, remainder = divmod(int(elapsed.total_seconds()), 3600)
+            elapsed = (now - _started_at_datetime(started_at)).total_seconds()
+            hours, remainder = divmod(int(elapsed), 3600)
             minutes = remainder // 60
             task_data['elapsed'] = f"{hours}h {minutes}m"
-            task_data['elapsed_minutes'] = int(elapsed.total_seconds() / 60)
+            task_data['elapsed_minutes'] = int(elapsed / 60)
         except (ValueError, TypeError):
             task_data['elapsed'] = '-'
             task_data['elapsed_minutes'] = 0
@@ -52,63 +76,182 @@ def get_all_tasks(
     Returns:
         List of task dictionaries with all frontmatter fields preserved
     """
+    task_files = list(_listed_task_files(project_id))
+    paths = [path for _, path in task_files]
+    parse = partial(parse_task_file, filters=_task_filters(agent_status, priority, category))
+
+    if len(paths) < PARALLEL_PARSE_THRESHOLD:
+        parsed = map(parse, paths)
+    else:
+        with ThreadPoolExecutor(max_workers=PARSE_WORKERS) as executor:
+            parsed = list(executor.map(parse, paths))
+
     tasks = []
+    repositories: Dict[str, Optional[Dict]] = {}
+    now = datetime.now()
+    for (project, path), (task_data, body, errors) in zip(task_files, parsed):
+        task_data = _listed_task(project, path, task_data, body, errors, repositories, now)
+        if task_data:
+            tasks.append(task_data)
+    return tasks
 
-    # Get all projects with tasks_path configured
-    projects = database.list_projects()
 
-    for project in projects:
-        # Skip if filtering by project and this isn't it
-        if project_id and project['id'] != project_id:
-            continue
+def iter_tasks(
+    project_id: Optional[str] = None,
+    agent_status: Optional[str] = None,
+    priority: Optional[str] = None,
+    category: Optional[str] = None,
+) -> Iterator[Dict]:
+    """
+    Iterate over tasks from markdown files with optional filtering.
+
+    Same tasks, in the same order, as get_all_tasks(), but each file is
+    only read when the next task is asked for, so a caller that needs the
+    first match stops there.
+    """
+    filters = _task_filters(agent_status, priority, category)
+    repositories: Dict[str, Optional[Dict]] = {}
+    now = datetime.now()
 
+    for project, path in _listed_task_files(project_id):
+        task_data, body, errors = parse_task_file(path, filters=filters)
+        task_data = _listed_task(project, path, task_data, body, errors, repositories, now)
+        if task_data:
+            yield task_data
+
+
+def _task_filters(
+    agent_status: Optional[str],
+    priority: Optional[str],
+    category: Optional[str],
+) -> Dict[str, str]:
+    """parse_task_file() filters for the fields a listing filters on"""
+    filters = {'agent_status': agent_status, 'priority': priority, 'category': category}
+    return {field: value for field, value in filters.items() if value}
+
+
+def _listed_task_files(project_id: Optional[str] = None) -> Iterator[Tuple[Dict, str]]:
+    """Yield (project, file path) for the markdown files in projects' task directories.
+
+    Rebuilds the task file index once a listing of every project is done.
+    """
+    global _task_file_index
+
+    # File for each task ID, first project first, as _task_files() finds them
+    index: Optional[Dict[str, str]] = None if project_id else {}
+
+    # Just the project asked for, or all of them
+    if project_id:
+        project = database.get_project(project_id)
+        projects = [project] if project else []
+    else:
+        projects = database.list_projects()
+
+    for project in projects:
         tasks_path = project.get('tasks_path')
         if not tasks_path:
             continue
 
-        tasks_dir = Path(tasks_path)
-        if not tasks_dir.exists():
+        try:
+            entries = list(os.scandir(Path(tasks_path)))
+        except OSError:
             continue
 
-        # Read all markdown files in the tasks directory
-        for md_file in tasks_dir.glob('*.md'):
-            task_data, body, errors = parse_task_file(md_file)
+        # Read all markdown files in the tasks directory (one directory read,
+        # with no Path built per file)
+        for entry in entries:
+            if entry.name.endswith('.md') and entry.is_file():
+                if index is not None:
+                    index.setdefault(entry.name[:-3], entry.path)
+                yield project, entry.path
+
+    if index is not None:
+        _task_file_index = index
+
+
+def _listed_task(
+    project: Dict,
+    path: str,
+    task_data: Optional[Dict],
+    body: Optional[str],
+    errors: List[str],
+    repositories: Dict[str, Optional[Dict]],
+    now: datetime,
+) -> Optional[Dict]:
+    """Finish a parsed task file for a task listing, or None if it's skipped.
+
+    repositories caches database.get_repository() results for the listing,
+    and now is the time its elapsed fields are measured to.
+    """
+    # Tasks left out by the listing's filters come back from
+    # parse_task_file() without data, like files that aren't tasks
+    if errors or not task_data:
+        return None
 
-            if errors or not task_data:
-                continue
+    # Add file path for reference
+    task_data['_file_path'] = path
+    task_data['_markdown_body'] = body
 
-            # Apply filters
-            if agent_status and task_data.get('agent_status') != agent_status:
-                continue
-            if priority and task_data.get('priority') != priority:
-                continue
-            if category and task_data.get('category') != category:
-                continue
+    # Normalize field names for backwards compatibility
+    task_data['task_id'] = task_data['id']
 
-            # Add file path for reference
-            task_data['_file_path'] = str(md_file)
-            task_data['_markdown_body'] = body
+    # Add project info
+    task_data['project_name'] = project.get('name', project['id'])
+    task_data['project'] = task_data['project_name']
 
-            # Normalize field names for backwards compatibility
-            task_data['task_id'] = task_data['id']
+    # Add repository info if available
+    if task_data.get('repository_id'):
+        repo = _repository(task_data['repository_id'], repositories)
+        if repo:
+            task_data['repository_name'] = repo.get('name')
+            task_data['repository_path'] = repo.get('path')
 
-            # Add project info
-            task_data['project_name'] = project.get('name', project['id'])
-            task_data['project'] = task_data['project_name']
+    # Calculate elapsed time
+    _calculate_elapsed(task_data, now)
 
-            # Add repository info if available
-            if task_data.get('repository_id'):
-                repo = database.get_repository(task_data['repository_id'])
-                if repo:
-                    task_data['repository_name'] = repo.get('name')
-                    task_data['repository_path'] = repo.get('path')
+    return task_data
 
-            # Calculate elapsed time
-            _calculate_elapsed(task_data)
 
-            tasks.append(task_data)
+def _task_files(task_id: str, projects: List[Dict]) -> Iterator[Tuple[Dict, Path]]:
+    """Yield (project, file) for each project with a file named for the task"""
+    for project in projects:
+        tasks_path = project.get('tasks_path')
+        if not tasks_path:
+            continue
+
+        task_file = Path(tasks_path) / f"{task_id}.md"
+        if task_file.exists():
+            yield project, task_file
 
-    return tasks
+
+def _repository(repository_id: str, repositories: Dict[str, Optional[Dict]]) -> Optional[Dict]:
+    """database.get_repository(), fetching each repository once per repositories cache"""
+    if repository_id not in repositories:
+        repositories[repository_id] = database.get_repository(repository_id)
+    return repositories[repository_id]
+
+
+def _find_task_file(task_id: str) -> Optional[Path]:
+    """Find a task's markdown file, the same one get_task() would load.
+
+    Only checks that the file parses as a task, skipping the repository
+    lookup and derived fields get_task() adds. Tries the task file index
+    before listing projects.
+    """
+    indexed = _task_file_index.get(task_id)
+    if indexed:
+        task_data, _, errors = parse_task_file(indexed)
+        if task_data and not errors:
+            return Path(indexed)
+
+    for _, task_file in _task_files(task_id, database.list_projects()):
+        task_data, _, errors = parse_task_file(task_file)
+        if task_data and not errors:
+            _task_file_index[task_id] = str(task_file)
+            return task_file
+
+    _task_file_index.pop(task_id, None)
+    return None
 
 
 def get_task(task_id: str) -> Optional[Dict]:
@@ -122,38 +265,31 @@ def get_task(task_id: str) -> Optional[Dict]:
         Task dictionary or None if not found
     """
     # Search all projects for this task
-    projects = database.list_projects()
-
-    for project in projects:
-        tasks_path = project.get('tasks_path')
-        if not tasks_path:
-            continue
-
-        task_file = Path(tasks_path) / f"{task_id}.md"
-        if task_file.exists():
-            task_data, body, errors = parse_task_file(task_file)
-            if task_data and not errors:
-                task_data['_file_path'] = str(task_file)
-                task_data['_markdown_body'] = body
+    for project, task_file in _task_files(task_id, database.list_projects()):
+        task_data, body, errors = parse_task_file(task_file)
+        if task_data and not errors:
+            _task_file_index[task_id] = str(task_file)
+            task_data['_file_path'] = str(task_file)
+            task_data['_markdown_body'] = body
 
-                # Normalize field names for backwards compatibility
-                task_data['task_id'] = task_data['id']
+            # Normalize field names for backwards compatibility
+            task_data['task_id'] = task_data['id']
 
-                task_data['project_name'] = project.get('name', project['id'])
-                task_data['project'] = task_data['project_name']
+            task_data['project_name'] = project.get('name', project['id'])
+            task_data['project'] = task_data['project_name']
 
-                # Add repository info
-                if task_data.get('repository_id'):
-                    repo = database.get_repository(task_data['repository_id'])
-                    if repo:
-                        task_data['repository_name'] = repo.get('name')
-                        task_data['repository_path'] = repo.get('path')
-                        task_data['default_branch'] = repo.get('default_branch', 'main')
+            # Add repository info
+            if task_data.get('repository_id'):
+                repo = database.get_repository(task_data['repository_id'])
+                if repo:
+                    task_data['repository_name'] = repo.get('name')
+                    task_data['repository_path'] = repo.get('path')
+                    task_data['default_branch'] = repo.get('default_branch', 'main')
 
-                # Calculate elapsed time
-                _calculate_elapsed(task_data)
+            # Calculate elapsed time
+            _calculate_elapsed(task_data, datetime.now())
 
-                return task_data
+            return task_data
 
     return None
 
@@ -203,22 +339,23 @@ def get_queued_tasks() -> List[Dict]:
     tasks = get_all_tasks(agent_status='queued')
 
     # Sort by priority (high > medium > low) then by created_at
-    priority_order = {'high': 0, 'medium': 1, 'low': 2}
+    tasks.sort(key=_queue_order)
 
-    def normalize_created_at(val):
-        """Normalize created_at to string for consistent sorting"""
-        if val is None:
-            return ''
-        if hasattr(val, 'isoformat'):  # datetime object
-            return val.isoformat()
-        return str(val)
+    return tasks
 
-    tasks.sort(key=lambda t: (
-        priority_order.get(t.get('priority', 'medium'), 1),
-        normalize_created_at(t.get('created_at'))
-    ))
 
-    return tasks
+def _queue_order(task: Dict) -> Tuple[int, str]:
+    """Sort key for queued tasks (list.sort() calls it once per task)"""
+    return _PRIORITY_ORDER.get(task.get('priority', 'medium'), 1), _normalize_created_at(task.get('created_at'))
+
+
+def _normalize_created_at(val) -> str:
+    """Normalize created_at to string for consistent sorting"""
+    if val is None:
+        return ''
+    if hasattr(val, 'isoformat'):  # datetime object
+        return val.isoformat()
+    return str(val)
 
 
 def query_tasks(
@@ -265,14 +402,18 @@ def update_task(task_id: str, updates: Dict) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    from agentctl.core.task_md import update_task_file
+    # update_task_file() parses the file itself and fails on one that isn't
+    # a valid task, so the file get_task() would load is the first it updates
+    indexed = _task_file_index.get(task_id)
+    if indexed and update_task_file(Path(indexed), updates):
+        return True
 
-    task = get_task(task_id)
-    if not task:
-        return False
+    for _, task_file in _task_files(task_id, database.list_projects()):
+        if update_task_file(task_file, updates):
+            _task_file_index[task_id] = str(task_file)
+            return True
 
-    file_path = Path(task['_file_path'])
-    return update_task_file(file_path, updates)
+    return False
 
 
 def delete_task(task_id: str) -> bool:
@@ -285,13 +426,14 @@ def delete_task(task_id: str) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    task = get_task(task_id)
-    if not task:
+    file_path = _find_task_file(task_id)
+    if not file_path:
         return False
 
     try:
-        file_path = Path(task['_file_path'])
         file_path.unlink()
+        forget_task_file(file_path)
+        _task_file_index.pop(task_id, None)
         return True
     except Exception:
         return False
@@ -307,10 +449,7 @@ def get_task_file_path(task_id: str) -> Optional[Path]:
     Returns:
         Path to the task file, or None if not found
     """
-    task = get_task(task_id)
-    if task and '_file_path' in task:
-        return Path(task['_file_path'])
-    return None
+    return _find_task_file(task_id)
 
 
 def get_tasks_for_project(project_id: str) -> List[Dict]:
@@ -90,6 +90,24 @@ def list_windows(session_name: str) -> List[Dict]:
     return windows
 
 
+def count_panes(session_name: str) -> int:
+    """Count the panes across all windows of a tmux session.
+
+    Args:
+        session_name: Name of the tmux session
+
+    Returns:
+        Number of panes, or 0 if session not found
+    """
+    server = get_server()
+    session = server.find_where({"session_name": session_name})
+
+    if not session:
+        return 0
+
+    return len(session.panes)
+
+
 def capture_window_pane(
     session_name: str,
     window: int = 0,
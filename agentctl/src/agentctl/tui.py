@@ -211,7 +211,7 @@ class ActivityLogWidget(Static):
         log_widget.clear()
 
         for event in reversed(events):
-            timestamp = event['timestamp'].strftime("%H:%M:%S")
+            timestamp = datetime.fromtimestamp(event['timestamp']).strftime("%H:%M:%S")
             icon = {
                 "task_started": "▶️",
                 "task_completed": "✅",
@@ -0,0 +1,19 @@
+"""Shared fixtures for core tests"""
+
+import pytest
+
+from agentctl.core import database
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """Point the database at a fresh file for one test.
+
+    Queued writes are only flushed when the test (or the code under test)
+    calls flush_writes(); the background writer isn't started.
+    """
+    database._write_queue.clear()
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "agentctl.db")
+    monkeypatch.setattr(database, "_ensure_writer", lambda: None)
+    yield tmp_path / "agentctl.db"
+    database._write_queue.clear()
@@ -0,0 +1,101 @@
+"""Tests for database module"""
+
+import sqlite3
+
+import pytest
+from agentctl.core import database
+from agentctl.core.session_parser import parse_session_log
+
+
+class TestTransaction:
+    def test_failed_commit_rolls_back(self, temp_db):
+        conn = database.get_connection()
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("CREATE TABLE parent (id INTEGER PRIMARY KEY)")
+        conn.execute("CREATE TABLE child (parent_id INTEGER REFERENCES parent(id) DEFERRABLE INITIALLY DEFERRED)")
+
+        # The deferred foreign key is only checked, and fails, at COMMIT
+        with pytest.raises(sqlite3.IntegrityError):
+            with database.transaction() as tx:
+                tx.execute("INSERT INTO child VALUES (1)")
+
+        assert not conn.in_transaction
+        with database.transaction() as tx:
+            tx.execute("INSERT INTO parent VALUES (1)")
+
+        other = sqlite3.connect(temp_db)
+        try:
+            assert other.execute("SELECT id FROM parent").fetchall() == [(1,)]
+            assert other.execute("SELECT parent_id FROM child").fetchall() == []
+        finally:
+            other.close()
+
+
+class TestAnalyticsSummary:
+    def test_cached_summary_is_not_shared_between_callers(self, temp_db):
+        metrics = parse_session_log("⏺ Read(src/main.py)\nError: build failed", task_id="T-1")
+        database.save_session_analytics("T-1", "agent-T-1", "/tmp/T-1.log", metrics)
+        expected = database.get_analytics_summary()
+
+        summary = database.get_analytics_summary()
+        summary["total_sessions"] = 99
+        summary["top_tools"].clear()
+        summary["recent_errors"].append({"error": "made up"})
+
+        assert database.get_analytics_summary() == expected
+        assert expected["total_sessions"] == 1
+        assert expected["top_tools"]
+
+
+class TestWriteQueue:
+    def test_flush_writes_queued_events(self, temp_db):
+        database.add_event("T-1", "task_started")
+        database.add_event("T-2", "task_paused")
+
+        events = database.get_recent_events()
+
+        assert sorted((e["task_id"], e["type"]) for e in events) == [
+            ("T-1", "task_started"),
+            ("T-2", "task_paused"),
+        ]
+        assert not database._write_queue
+
+    def test_failing_row_is_dropped_and_others_written(self, temp_db, caplog):
+        database.add_event("T-1", "task_started")
+        database.add_event(None, "task_started")  # NOT NULL violation
+        database.add_event("T-2", "task_started")
+
+        events = database.get_recent_events()
+
+        assert sorted(e["task_id"] for e in events) == ["T-1", "T-2"]
+        assert not database._write_queue
+        assert "NOT NULL constraint failed" in caplog.text
+
+    def test_queue_keeps_working_after_failing_row(self, temp_db):
+        database.add_event(None, "task_started")
+        database.flush_writes()
+
+        database.add_event("T-3", "task_completed")
+
+        assert [e["task_id"] for e in database.get_recent_events()] == ["T-3"]
+
+    def test_busy_database_requeues_writes(self, temp_db):
+        database.get_connection().execute("PRAGMA busy_timeout=0")
+        database.add_event("T-1", "task_started")
+        database.add_event("T-2", "task_started")
+
+        # Another connection holding the write lock
+        other = sqlite3.connect(temp_db, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        try:
+            with pytest.raises(sqlite3.OperationalError):
+                database.flush_writes()
+            assert [params[0] for _, params in database._write_queue] == ["T-1", "T-2"]
+        finally:
+            other.execute("ROLLBACK")
+            other.close()
+
+        database.flush_writes()
+
+        assert sorted(e["task_id"] for e in database.get_recent_events()) == ["T-1", "T-2"]
+        assert not database._write_queue
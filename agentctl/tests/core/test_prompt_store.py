@@ -0,0 +1,195 @@
+"""Tests for prompt_store module"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pytest
+from agentctl.core import database, prompt_store
+
+
+class TestAddToHistory:
+    def test_entry_is_readable_after_queueing(self, temp_db):
+        prompt_id = prompt_store.create_prompt("Write tests", title="tests")
+
+        history_id = prompt_store.add_to_history("Write tests", task_id="T-1", phase="planning", prompt_id=prompt_id)
+
+        history = prompt_store.get_history()
+        assert [entry["id"] for entry in history] == [history_id]
+        assert history[0]["prompt_title"] == "tests"
+        assert prompt_store.get_prompt(prompt_id)["use_count"] == 1
+
+    def test_failing_entry_does_not_block_readers_or_other_writes(self, temp_db):
+        first = prompt_store.add_to_history("first", task_id="T-1")
+        prompt_store.add_to_history(None, task_id="T-1")  # NOT NULL violation
+        database.add_event("T-1", "task_started")
+        second = prompt_store.add_to_history("second", task_id="T-1")
+
+        assert prompt_store.list_prompts() == []
+        assert sorted(entry["id"] for entry in prompt_store.get_history()) == sorted([first, second])
+        assert [event["task_id"] for event in database.get_recent_events()] == ["T-1"]
+        assert not database._write_queue
+
+    def test_reader_waits_for_batch_being_committed(self, temp_db, monkeypatch):
+        assert prompt_store.get_history(task_id="T-1") == []  # warm reader connection
+
+        # Hold the writer inside its transaction, after it took the batch
+        in_transaction = threading.Event()
+        release = threading.Event()
+        transaction = database.transaction
+
+        @contextmanager
+        def held_transaction():
+            with transaction() as conn:
+                yield conn
+                if threading.current_thread() is writer:
+                    in_transaction.set()
+                    release.wait(5)
+
+        monkeypatch.setattr(database, "transaction", held_transaction)
+        prompt_store.add_to_history("hello world", task_id="T-1")
+        writer = threading.Thread(target=database.flush_writes)
+        writer.start()
+        try:
+            assert in_transaction.wait(5)
+            assert not database._write_queue
+            threading.Timer(0.2, release.set).start()
+
+            history = prompt_store.get_history(task_id="T-1")
+        finally:
+            release.set()
+            writer.join()
+
+        assert [entry["prompt_text"] for entry in history] == ["hello world"]
+
+
+class TestSearch:
+    TEXTS = ["snake_case name", "plain text", "100% done", "abc"]
+
+    @pytest.mark.parametrize("fts", [True, False])
+    @pytest.mark.parametrize("search, expected", [
+        ("_", ["snake_case name"]),
+        ("%", ["100% done"]),
+        ("e_c", ["snake_case name"]),
+        ("0% d", ["100% done"]),
+        ("a%c", []),
+        ("PLAIN", ["plain text"]),
+    ])
+    def test_wildcards_match_literally(self, temp_db, monkeypatch, fts, search, expected):
+        for text in self.TEXTS:
+            prompt_store.create_prompt(text)
+            prompt_store.add_to_history(text, task_id="T-1")
+        if fts and not database.FTS_AVAILABLE:
+            pytest.skip("SQLite built without FTS5")
+        monkeypatch.setattr(database, "FTS_AVAILABLE", fts)
+
+        assert sorted(prompt["text"] for prompt in prompt_store.list_prompts(search=search)) == expected
+        assert sorted(entry["prompt_text"] for entry in prompt_store.search_history(search)) == expected
+
+
+class TestCachedLookups:
+    def test_warm_lookup_runs_no_sql(self, temp_db):
+        prompt_id = prompt_store.create_prompt("Plan the work")
+        prompt_store.add_prompt_to_workflow(prompt_id, "planning")
+        assert prompt_store.is_prompt_in_workflow(prompt_id, "planning")
+        assert prompt_store.get_workflow_phases() == ["planning"]
+
+        statements = []
+        database.get_connection().set_trace_callback(statements.append)
+        try:
+            assert prompt_store.is_prompt_in_workflow(prompt_id, "planning")
+            assert prompt_store.get_workflow_phases() == ["planning"]
+        finally:
+            database.get_connection().set_trace_callback(None)
+
+        assert statements == []
+
+    def test_local_writes_invalidate_immediately(self, temp_db):
+        prompt_id = prompt_store.create_prompt("Plan the work", category="planning")
+        assert prompt_store.get_categories() == ["planning"]
+        assert not prompt_store.is_prompt_in_workflow(prompt_id, "planning")
+
+        prompt_store.create_prompt("Test it", category="testing")
+        prompt_store.add_prompt_to_workflow(prompt_id, "planning")
+
+        assert prompt_store.get_categories() == ["planning", "testing"]
+        assert prompt_store.is_prompt_in_workflow(prompt_id, "planning")
+
+    def test_other_connections_writes_seen_after_recheck_interval(self, temp_db, monkeypatch):
+        prompt_id = prompt_store.create_prompt("Plan the work")
+        assert not prompt_store.is_prompt_in_workflow(prompt_id, "planning")
+
+        other = sqlite3.connect(temp_db)
+        with other:
+            other.execute(
+                "INSERT INTO prompt_workflows (id, phase, prompt_id, order_index) VALUES ('w1', 'planning', ?, 0)",
+                (prompt_id,),
+            )
+        other.close()
+
+        monkeypatch.setattr(prompt_store, "LOOKUP_RECHECK_INTERVAL", 0)
+        assert prompt_store.is_prompt_in_workflow(prompt_id, "planning")
+
+
+class TestWorkflows:
+    def test_entries_append_to_their_phase(self, temp_db):
+        first = prompt_store.create_prompt("Plan")
+        second = prompt_store.create_prompt("Design")
+        other = prompt_store.create_prompt("Test")
+
+        prompt_store.add_prompt_to_workflow(first, "planning")
+        prompt_store.add_prompt_to_workflow(other, "testing", order_index=5)
+        prompt_store.add_prompt_to_workflow(second, "planning")
+
+        assert [p["id"] for p in prompt_store.get_workflow_prompts("planning")] == [first, second]
+        assert [p["id"] for p in prompt_store.get_workflow_prompts("testing")] == [other]
+
+
+class TestBulkOperations:
+    def _history_rows(self):
+        return sorted((
+            (entry["prompt_text"], entry["task_id"], entry["phase"], entry["prompt_id"])
+            for entry in prompt_store.get_history(limit=100)
+        ), key=repr)
+
+    def test_bulk_add_to_history_matches_add_to_history(self, temp_db):
+        prompt_id = prompt_store.create_prompt("Write tests")
+        entries = [
+            ("Write tests", "T-1", "implementation", prompt_id),
+            ("free text", "T-1", None, None),
+            ("Write tests", None, None, prompt_id),
+        ]
+
+        for entry in entries:
+            text, task_id, phase, entry_prompt_id = entry
+            prompt_store.add_to_history(text, task_id=task_id, phase=phase, prompt_id=entry_prompt_id)
+        one_by_one = (self._history_rows(), prompt_store.get_prompt(prompt_id)["use_count"])
+
+        database.get_connection().execute("DELETE FROM prompt_history")
+        database.get_connection().execute("UPDATE prompts SET use_count = 0")
+
+        history_ids = prompt_store.bulk_add_to_history(entries)
+
+        assert (self._history_rows(), prompt_store.get_prompt(prompt_id)["use_count"]) == one_by_one
+        assert len(set(history_ids)) == 3
+        assert sorted(history_ids) == sorted(entry["id"] for entry in prompt_store.get_history())
+
+    def test_bulk_add_to_history_with_no_entries(self, temp_db):
+        assert prompt_store.bulk_add_to_history([]) == []
+        assert prompt_store.get_history() == []
+
+    def test_bulk_increment_use_counts_matches_increment_use_count(self, temp_db):
+        first = prompt_store.create_prompt("one")
+        second = prompt_store.create_prompt("two")
+        unused = prompt_store.create_prompt("three")
+        uses = [first, second, first, "missing", first]
+
+        for prompt_id in uses:
+            prompt_store.increment_use_count(prompt_id)
+        one_by_one = {p: prompt_store.get_prompt(p)["use_count"] for p in (first, second, unused)}
+
+        database.get_connection().execute("UPDATE prompts SET use_count = 0")
+        prompt_store.bulk_increment_use_counts(uses)
+
+        assert {p: prompt_store.get_prompt(p)["use_count"] for p in (first, second, unused)} == one_by_one
+        assert one_by_one == {first: 3, second: 1, unused: 0}
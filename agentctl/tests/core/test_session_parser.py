@@ -0,0 +1,57 @@
+"""Tests for session_parser module"""
+
+import pytest
+from agentctl.core.session_parser import parse_session_log
+
+
+class TestMcpToolCounting:
+    @pytest.mark.parametrize("lite", [False, True])
+    def test_counts_mcp_tool_under_full_name(self, lite):
+        metrics = parse_session_log("⏺ mcp__github__list_issues(repo: \"agentctl\")", lite=lite)
+
+        assert metrics.tool_counts == {"mcp__github__list_issues": 1}
+        assert metrics.total_tool_calls == 1
+
+    def test_counts_each_mcp_tool_separately(self):
+        log = "\n".join([
+            "⏺ Read(src/main.py)",
+            "⏺ mcp__github__list_issues(repo: \"agentctl\")",
+            "⏺ mcp__github__get_issue(number: 12)",
+            "⏺ mcp__github__list_issues(repo: \"other\")",
+        ])
+
+        metrics = parse_session_log(log)
+
+        assert metrics.tool_counts == {
+            "Read": 1,
+            "mcp__github__list_issues": 2,
+            "mcp__github__get_issue": 1,
+        }
+        assert [call.tool_name for call in metrics.tool_calls] == [
+            "Read",
+            "mcp__github__list_issues",
+            "mcp__github__get_issue",
+            "mcp__github__list_issues",
+        ]
+
+    def test_keeps_mcp_tool_name_as_written(self):
+        metrics = parse_session_log("⏺ MCP__Github__List_Issues(repo: \"agentctl\")")
+
+        assert metrics.tool_counts == {"MCP__Github__List_Issues": 1}
+
+    @pytest.mark.parametrize("line", [
+        "⏺ mcp__ (no tool name)",
+        "configured the mcp__ prefix",
+        "see mcp__",
+    ])
+    def test_bare_prefix_is_not_a_tool(self, line):
+        metrics = parse_session_log(line)
+
+        assert metrics.tool_counts == {}
+        assert metrics.total_tool_calls == 0
+
+    def test_prefix_inside_a_word_is_not_a_tool(self):
+        metrics = parse_session_log("⏺ Calling xmcp__github__list_issues(repo)")
+
+        assert "xmcp__github__list_issues" not in metrics.tool_counts
+        assert "mcp__github__list_issues" not in metrics.tool_counts
@@ -0,0 +1,229 @@
+"""Tests for task_md module"""
+
+import random
+
+import frontmatter
+import pytest
+from agentctl.core import task_md
+from agentctl.core.task_md import _parse_flat_yaml, _parse_frontmatter
+
+
+def _frontmatter_loads(text):
+    """What task files were read with before the flat fast path"""
+    try:
+        post = frontmatter.loads(text)
+    except Exception as e:
+        return type(e)
+    return post.metadata, post.content
+
+
+def _assert_same_as_frontmatter(text):
+    expected = _frontmatter_loads(text)
+    if isinstance(expected, type):
+        with pytest.raises(expected):
+            _parse_frontmatter(text)
+        return
+
+    metadata, content = _parse_frontmatter(text)
+    assert (metadata, content) == expected
+    # Same types too: 1 == True and 0 == False would hide a bad resolve
+    assert [type(value) for value in metadata.values()] == [type(value) for value in expected[0].values()]
+
+
+def _fm(*lines):
+    """Split out a document's frontmatter, as _parse_frontmatter() does"""
+    text = "---\n" + "\n".join(lines) + "\n---\nbody"
+    fm, _ = task_md._YAML_HANDLER.split(text)
+    return fm
+
+
+class TestFlatFrontmatter:
+    @pytest.mark.parametrize("line, value", [
+        ("title: Fix the parser", "Fix the parser"),
+        ("title: 'it''s quoted: with # chars'", "it's quoted: with # chars"),
+        ("title: ''", ""),
+        ("title: '2024-01-02'", "2024-01-02"),
+        ("title:", None),
+        ("title: null", None),
+        ("title: ~", None),
+        ("title: true", True),
+        ("title: False", False),
+        ("title: yes", True),            # YAML 1.1 bools, as PyYAML reads them
+        ("title: off", False),
+        ("title: 0", 0),
+        ("title: 42", 42),
+        ("title: TASK-0001", "TASK-0001"),
+        ("title: a:b", "a:b"),
+        ("title: ünïcode", "ünïcode"),
+    ])
+    def test_reads_scalars_without_pyyaml(self, line, value):
+        metadata = _parse_flat_yaml(_fm("id: A-B-1", line))
+
+        assert metadata == {"id": "A-B-1", "title": value}
+        assert type(metadata["title"]) is type(value)
+        _assert_same_as_frontmatter(f"---\nid: A-B-1\n{line}\n---\nbody")
+
+    @pytest.mark.parametrize("lines", [
+        ["on: x"],                       # key resolves to a bool
+        ["yes: x"],
+        ["null: x"],
+        ["1: x"],                        # key resolves to an int
+        ["content: x"],                  # frontmatter.Post() keyword arguments
+        ["handler: x"],
+        ["title: 012"],                  # octal, hex, underscores
+        ["title: 0x1f"],
+        ["title: 1_000"],
+        ["title: 1.5"],                  # floats and timestamps
+        ["title: 2024-01-02"],
+        ['title: "double quoted"'],
+        ["title: a: b"],
+        ["title: value # comment"],
+        ["# comment line", "title: x"],
+        ["title:\tx"],                   # tabs
+        ["title: a\tb"],
+        ["tags:", "  - a"],              # nested values
+        ["title: [a, b]"],
+        ["title: &anchor x"],
+        ["title: |", "  block"],
+    ])
+    def test_falls_back_to_pyyaml(self, lines):
+        assert _parse_flat_yaml(_fm("id: A-B-1", *lines)) is None
+        _assert_same_as_frontmatter("---\nid: A-B-1\n" + "\n".join(lines) + "\n---\nbody")
+
+    def test_task_files_as_written_take_the_fast_path(self, tmp_path):
+        data = task_md.generate_task_template("P-FEATURE-0001", "Fix: it's a \"test\" # x", "P", repository_id="r")
+        task_file = tmp_path / "P-FEATURE-0001.md"
+        task_md.write_task_file(task_file, data, "# Title\n\nbody")
+        text = task_file.read_text()
+
+        fm, _ = task_md._YAML_HANDLER.split(text)
+        assert _parse_flat_yaml(fm) is not None
+        _assert_same_as_frontmatter(text)
+
+    @pytest.mark.parametrize("text", [
+        "",
+        "no frontmatter: here",
+        "---\n---\nbody",
+        "---\nunterminated: x\n",
+        "+++\ntitle = 'toml'\n+++\nbody",
+        "\n\n---\ntitle: x\n---\n\n\nbody\n---\nmore\n\n",
+    ])
+    def test_documents_around_the_frontmatter(self, text):
+        _assert_same_as_frontmatter(text)
+
+    def test_matches_frontmatter_on_generated_documents(self):
+        rng = random.Random(0)
+        atoms = [
+            "yes", "No", "on", "OFF", "true", "null", "~", "", "0", "12", "012", "0x1f", "1_0", "1.5",
+            ".inf", "2024-01-02", "2024-01-02T10:00:00", "a: b", "a #c", "x:", "it's", "-x", "- x",
+            "[a]", "{a}", "&a", "*a", "!t", "|", ">", "%x", "@x", "`x", "hello world", "FEATURE",
+            '"q"', "'q'", "a\tb", "tail ", "ünï", "a,b", "?x", ":x", "#x", "<<", "x # y", "+1", "-1",
+        ]
+        keys = ["content", "handler", "id", "title", "agent_status", "y", "on", "true", "null", "1", "key-with-dash"]
+
+        for _ in range(3000):
+            lines = []
+            for _ in range(rng.randint(0, 6)):
+                key = rng.choice(keys)
+                value = " ".join(rng.choice(atoms) for _ in range(rng.randint(0, 2)))
+                if rng.random() < 0.2:
+                    lines.append(f"{key}: '" + value.replace("'", "''") + "'")
+                else:
+                    lines.append(f"{key}: {value}")
+            body = rng.choice(["", "# T\n\nbody", "\n\nbody\n---\nx"])
+            _assert_same_as_frontmatter("---\n" + "\n".join(lines) + "\n---\n" + body)
+
+
+def _write_task(tmp_path, *lines):
+    path = tmp_path / "TASK.md"
+    path.write_text("---\n" + "\n".join(("id: RRA-API-0001", "title: Task", "project_id: RRA") + lines) + "\n---\nbody\n")
+    return path
+
+
+class TestParseTaskFileFilters:
+    @pytest.fixture(autouse=True)
+    def yaml_parses(self, monkeypatch):
+        """Count the files whose frontmatter gets parsed"""
+        parsed = []
+        parse_frontmatter = task_md._parse_frontmatter
+
+        def counting_parse(text):
+            parsed.append(text)
+            return parse_frontmatter(text)
+
+        monkeypatch.setattr(task_md, "_parse_frontmatter", counting_parse)
+        task_md._parsed_files.clear()
+        yield parsed
+        task_md._parsed_files.clear()
+
+    @pytest.mark.parametrize("lines, agent_status", [
+        (("status: in-progress",), "running"),
+        (("status: In Progress",), "running"),
+        (("status: active",), "running"),
+        (("status: done",), "completed"),
+        (("status: Finished",), "completed"),
+        (("status: on-hold",), "blocked"),
+        (("status: error",), "failed"),
+        (("started_at: '2024-01-01T10:00:00'",), "running"),
+        (("started_at: '2024-01-01T10:00:00'", "completed_at: '2024-01-02T10:00:00'"), "completed"),
+        (("completed_at: '2024-01-02T10:00:00'",), "completed"),
+    ])
+    def test_keeps_tasks_with_derived_agent_status(self, tmp_path, lines, agent_status):
+        path = _write_task(tmp_path, *lines)
+
+        task_data, body, errors = task_md.parse_task_file(path, filters={"agent_status": agent_status})
+
+        assert task_data is not None
+        assert task_data["agent_status"] == agent_status
+        assert (body, errors) == ("body", [])
+
+    def test_keeps_tasks_with_default_agent_status(self, tmp_path):
+        path = _write_task(tmp_path)
+
+        task_data, _, _ = task_md.parse_task_file(path, filters={"agent_status": "queued"})
+
+        assert task_data["agent_status"] == "queued"
+
+    @pytest.mark.parametrize("lines, filters", [
+        (("agent_status: queued",), {"agent_status": "running"}),
+        (("status: todo",), {"agent_status": "completed"}),
+        (("priority: low",), {"priority": "high"}),
+        (("agent_status: running", "category: BUG"), {"agent_status": "running", "category": "FEATURE"}),
+    ])
+    def test_skips_tasks_that_cannot_match_without_parsing(self, tmp_path, yaml_parses, lines, filters):
+        path = _write_task(tmp_path, *lines)
+
+        assert task_md.parse_task_file(path, filters=filters) == (None, None, [])
+        assert yaml_parses == []
+
+    @pytest.mark.parametrize("lines, filters", [
+        (("status: done", "started_at: '2024-01-01T10:00:00'"), {"agent_status": "running"}),
+        (("agent_status: blocked", "started_at: '2024-01-01T10:00:00'"), {"agent_status": "running"}),
+        (("title_note: high priority",), {"priority": "high"}),
+    ])
+    def test_drops_tasks_that_only_mention_the_value(self, tmp_path, lines, filters):
+        path = _write_task(tmp_path, *lines)
+
+        assert task_md.parse_task_file(path, filters=filters) == (None, None, [])
+
+    def test_matches_parse_then_filter(self, tmp_path):
+        statuses = [None, "agent_status: running", "agent_status: completed", "status: in-progress",
+                    "status: done", "status: waiting", "status: x"]
+        dates = [None, "started_at: '2024-01-01'", "completed_at: '2024-01-02'"]
+        priorities = [None, "priority: high", 'priority: "high"', "priority: low"]
+        filter_sets = [{"agent_status": status} for status in task_md.VALID_AGENT_STATUS]
+        filter_sets += [{"priority": "high"}, {"agent_status": "running", "priority": "high"}]
+
+        for status in statuses:
+            for date in dates:
+                for priority in priorities:
+                    path = _write_task(tmp_path, *filter(None, (status, date, priority)))
+                    task_md._parsed_files.clear()
+                    task_data, body, _ = task_md.parse_task_file(path)
+
+                    for filters in filter_sets:
+                        task_md._parsed_files.clear()
+                        expected = (None, None, [])
+                        if all(task_data.get(field) == value for field, value in filters.items()):
+                            expected = (task_data, body, [])
+                        assert task_md.parse_task_file(path, filters=filters) == expected, (path.read_text(), filters)